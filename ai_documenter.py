@@ -1,17 +1,106 @@
-from transformers import AutoTokenizer, AutoModelForCausalLM
+import threading
+from typing import List
+
+from analysis_cache import AnalysisCache, content_hash
+
+DEFAULT_BATCH_SIZE = 8
+
 
 class AIDocumenter:
-    def __init__(self):
+    def __init__(self, warm_up: bool = False, cache: AnalysisCache = None,
+                 batch_size: int = DEFAULT_BATCH_SIZE, num_threads: int = None,
+                 retry_fallbacks: bool = False):
         self.model_name = "microsoft/codebert-base-mlm"  # Smaller model, better for code documentation
-        print("Loading AI model...")
-        self.tokenizer = AutoTokenizer.from_pretrained(self.model_name, local_files_only=False, trust_remote_code=True)
-        self.model = AutoModelForCausalLM.from_pretrained(self.model_name, local_files_only=False, trust_remote_code=True)
-        print("AI model loaded successfully!")
+        self.cache = cache
+        # Fallback descriptions are cached too, so a run without the model
+        # does not try to load it again; retry_fallbacks regenerates them
+        self.retry_fallbacks = retry_fallbacks
+        self.batch_size = max(1, batch_size)
+        self.num_threads = num_threads
+        self.tokenizer = None
+        self.model = None
+        self._load_lock = threading.Lock()
+        self._loaded = False
+        self._generation_failed = False
+        # transformers is only imported, and the model only loaded, on first
+        # use; warm_up() starts that early in the background
+        if warm_up:
+            self.warm_up()
+
+    def warm_up(self) -> threading.Thread:
+        thread = threading.Thread(target=self.load, name="ai-documenter-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def load(self):
+        with self._load_lock:
+            if self._loaded:
+                return
+            try:
+                from transformers import AutoTokenizer, AutoModelForCausalLM
+                print("Loading AI model...")
+                self.tokenizer = AutoTokenizer.from_pretrained(self.model_name, local_files_only=False, trust_remote_code=True)
+                self.model = AutoModelForCausalLM.from_pretrained(self.model_name, local_files_only=False, trust_remote_code=True)
+                if self.num_threads:
+                    import torch
+                    torch.set_num_threads(self.num_threads)
+                print("AI model loaded successfully!")
+            except Exception as e:
+                print(f"AI model unavailable ({e}); using line-count descriptions")
+            self._loaded = True
 
     def generate_description(self, code: str) -> str:
+        return self.generate_descriptions([code])[0]
+
+    def generate_descriptions(self, codes: List[str]) -> List[str]:
+        """Describe many snippets at once.
+
+        Snippets seen before (same content and model) come from the cache,
+        including line-count fallbacks from runs where the model could not
+        generate; the rest go through the model in padded batches of
+        `batch_size`, and the model is only loaded if something is missing.
+        Batches run one after another: the CPU threads are torch's intra-op
+        threads inside each batch (`num_threads`), since a fast tokenizer
+        cannot be shared between Python threads.
+        """
+        kind = f"ai_description:{self.model_name}"
+        keys = [content_hash(code.encode('utf-8')) for code in codes]
+        descriptions = [None] * len(codes)
+        missing = []
+        for i, key in enumerate(keys):
+            cached = self.cache.get(kind, key) if self.cache is not None else None
+            if cached is not None and not (cached.get('fallback') and self.retry_fallbacks):
+                descriptions[i] = cached['description']
+            else:
+                missing.append(i)
+
+        for start in range(0, len(missing), self.batch_size):
+            batch = missing[start:start + self.batch_size]
+            generated = self._generate_batch([codes[i] for i in batch])
+            for i, description in zip(batch, generated):
+                entry = {'description': description}
+                if description is None:
+                    entry = {'description': self._fallback(codes[i]), 'fallback': True}
+                descriptions[i] = entry['description']
+                if self.cache is not None:
+                    self.cache.put(kind, keys[i], entry)
+        return descriptions
+
+    def _generate_batch(self, codes: List[str]) -> List:
+        # None marks a snippet the model could not describe
+        if self._generation_failed:
+            return [None] * len(codes)
+        self.load()
         try:
-            inputs = self.tokenizer(code, return_tensors="pt", max_length=512, truncation=True)
+            inputs = self.tokenizer(codes, return_tensors="pt", max_length=512,
+                                    truncation=True, padding=True)
             outputs = self.model.generate(**inputs, max_length=150, num_return_sequences=1)
-            return self.tokenizer.decode(outputs[0], skip_special_tokens=True)
-        except Exception as e:
-            return f"Code analysis module: {len(code.splitlines())} lines of code"
+            return self.tokenizer.batch_decode(outputs, skip_special_tokens=True)
+        except Exception:
+            # A model that cannot generate will not start to on the next
+            # batch; skip straight to the fallback from now on
+            self._generation_failed = True
+            return [None] * len(codes)
+
+    def _fallback(self, code: str) -> str:
+        return f"Code analysis module: {len(code.splitlines())} lines of code"
@@ -0,0 +1,124 @@
+import hashlib
+import json
+import sqlite3
+import time
+from typing import Dict, Optional
+
+# Bump whenever the output of the analyzers changes so stale entries are ignored
+ANALYZER_VERSION = "3"
+
+# Kinds (up to the first ':') whose payloads do not come from the analyzers
+# carry their own version, so an analyzer bump leaves them alone
+KIND_VERSIONS = {
+    'ai_description': "1",
+    'graph_layout': "1"
+}
+
+DEFAULT_CACHE_PATH = ".analysis_cache.sqlite"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class AnalysisCache:
+    """On-disk cache of per-file analysis results.
+
+    Entries are keyed by (kind, content hash, version) so a file is only
+    re-parsed when its bytes or the analyzer change; kinds listed in
+    KIND_VERSIONS use their own version instead of the analyzer's. Payloads
+    are JSON; when the database grows past `max_bytes` the least recently
+    used entries are evicted.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES,
+                 version: str = ANALYZER_VERSION):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                kind TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                version TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (kind, hash, version)
+            )
+        """)
+
+    def version_of(self, kind: str) -> str:
+        return KIND_VERSIONS.get(kind.split(':', 1)[0], self.version)
+
+    def get(self, kind: str, key: str) -> Optional[Dict]:
+        row = self.connection.execute(
+            "SELECT payload FROM entries WHERE kind = ? AND hash = ? AND version = ?",
+            (kind, key, self.version_of(kind))
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.connection.execute(
+            "UPDATE entries SET last_used = ? WHERE kind = ? AND hash = ? AND version = ?",
+            (time.time(), kind, key, self.version_of(kind))
+        )
+        return json.loads(row[0])
+
+    def probe(self, kind: str, key: str) -> bool:
+        # Counts a miss when absent; the hit is counted by the get() that follows
+        row = self.connection.execute(
+            "SELECT 1 FROM entries WHERE kind = ? AND hash = ? AND version = ?",
+            (kind, key, self.version_of(kind))
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+        return row is not None
+
+    def put(self, kind: str, key: str, payload: Dict):
+        data = json.dumps(payload)
+        self.connection.execute(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+            (kind, key, self.version_of(kind), data, len(data), time.time())
+        )
+
+    def total_size(self) -> int:
+        return self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def evict(self):
+        # Entries from other versions of their kind can never hit again
+        stale_kinds = [(kind, version) for kind, version in
+                       self.connection.execute("SELECT DISTINCT kind, version FROM entries")
+                       if version != self.version_of(kind)]
+        self.connection.executemany("DELETE FROM entries WHERE kind = ? AND version = ?",
+                                    stale_kinds)
+        excess = self.total_size() - self.max_bytes
+        if excess <= 0:
+            return
+
+        rows = self.connection.execute(
+            "SELECT kind, hash, version, size FROM entries ORDER BY last_used"
+        )
+        stale = []
+        for kind, key, version, size in rows:
+            if excess <= 0:
+                break
+            stale.append((kind, key, version))
+            excess -= size
+        self.connection.executemany(
+            "DELETE FROM entries WHERE kind = ? AND hash = ? AND version = ?", stale
+        )
+
+    def close(self):
+        self.evict()
+        self.connection.commit()
+        self.connection.close()
+
+    def stats(self) -> str:
+        return f"Cache: {self.hits} hits, {self.misses} misses"
@@ -0,0 +1,137 @@
+import json
+import os
+import re
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+ANSWER_CACHE_FILE = "answer_cache.json"
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_SIMILARITY = 0.95
+
+
+def normalize_question(question: str) -> str:
+    question = re.sub(r"\s+", " ", question.strip().lower())
+    return question.rstrip(" ?!.")
+
+
+class AnswerCache:
+    """Two-level cache of answers for CodeQASystem.
+
+    The exact level is an LRU keyed by the normalized question and the index
+    version; the semantic level reuses the answer of a cached question whose
+    embedding has cosine similarity of at least `threshold` with the new
+    one. Each entry remembers the content hashes of the files its answer was
+    retrieved from and is dropped as soon as any of them changes.
+    """
+
+    def __init__(self, path: str, index_version: str, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 threshold: float = DEFAULT_SIMILARITY):
+        self.path = path
+        self.index_version = index_version
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.entries: OrderedDict = OrderedDict()
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self._matrix = None
+
+    def load(self, file_hashes: Dict[str, str]):
+        """Load saved entries, keeping those still valid for `file_hashes`."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r') as f:
+            data = json.load(f)
+        if data.get('index_version') != self.index_version:
+            return
+        for entry in data['entries']:
+            if self._is_fresh(entry, file_hashes):
+                self.entries[entry['question']] = entry
+        self._matrix = None
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'w') as f:
+            json.dump({'index_version': self.index_version,
+                       'entries': list(self.entries.values())}, f)
+
+    def get(self, question: str, embedding: Optional[List[float]],
+            file_hashes: Dict[str, str]) -> Optional[str]:
+        answer = self.get_exact(question, file_hashes)
+        if answer is not None:
+            return answer
+        return self.get_similar(embedding, file_hashes)
+
+    def get_exact(self, question: str, file_hashes: Dict[str, str]) -> Optional[str]:
+        """Exact-question lookup; needs no embedding, so try it first."""
+        key = normalize_question(question)
+        entry = self.entries.get(key)
+        if entry is not None and self._is_fresh(entry, file_hashes):
+            self.entries.move_to_end(key)
+            self.exact_hits += 1
+            return entry['answer']
+        if entry is not None:
+            self._drop(key)
+        return None
+
+    def get_similar(self, embedding: Optional[List[float]],
+                    file_hashes: Dict[str, str]) -> Optional[str]:
+        """Semantic lookup, counting a miss when nothing is close enough."""
+        if embedding is not None:
+            # A stale best match must not hide a fresh one just behind it
+            for match in self._candidates(embedding):
+                entry = self.entries[match]
+                if self._is_fresh(entry, file_hashes):
+                    self.entries.move_to_end(match)
+                    self.semantic_hits += 1
+                    return entry['answer']
+                self._drop(match)
+        self.misses += 1
+        return None
+
+    def put(self, question: str, embedding: Optional[List[float]], answer: str,
+            sources: Dict[str, str]):
+        key = normalize_question(question)
+        self.entries[key] = {
+            'question': key,
+            'answer': answer,
+            'sources': sources,
+            'embedding': list(map(float, embedding)) if embedding is not None else None
+        }
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        self._matrix = None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'entries': len(self.entries),
+            'exact_hits': self.exact_hits,
+            'semantic_hits': self.semantic_hits,
+            'misses': self.misses
+        }
+
+    def _is_fresh(self, entry: Dict, file_hashes: Dict[str, str]) -> bool:
+        return all(file_hashes.get(path) == digest for path, digest in entry['sources'].items())
+
+    def _drop(self, key: str):
+        del self.entries[key]
+        self._matrix = None
+
+    def _candidates(self, embedding: List[float]) -> List[str]:
+        """Keys of entries at least `threshold` similar, most similar first."""
+        import numpy as np
+        if self._matrix is None:
+            keys = [key for key, entry in self.entries.items() if entry['embedding'] is not None]
+            if not keys:
+                return []
+            matrix = np.array([self.entries[key]['embedding'] for key in keys], dtype=np.float32)
+            matrix /= np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-12
+            self._matrix = (keys, matrix)
+        keys, matrix = self._matrix
+        query = np.asarray(embedding, dtype=np.float32)
+        if len(query) != matrix.shape[1]:
+            return []
+        scores = matrix @ (query / (np.linalg.norm(query) + 1e-12))
+        above = np.flatnonzero(scores >= self.threshold)
+        return [keys[i] for i in above[np.argsort(-scores[above], kind='stable')].tolist()]
@@ -0,0 +1,80 @@
+"""Compare AnalysisEngine's batch scheduler with sequential batch processing.
+
+The sequential baseline validates the list and awaits process_batch one
+batch at a time, as run_analysis used to. Each scheduler configuration
+(thread pool, process pool, and an async generator as input) must compile
+the same result, timestamp aside, before its time is reported.
+
+Usage:
+    python -m benchmarks.analysis_engine --values 1000000 --batch-size 10000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+SAMPLE_PROJECT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              'data_analysis_project')
+sys.path.insert(0, SAMPLE_PROJECT)
+
+from analysis_engine import AnalysisEngine  # noqa: E402
+
+
+async def run_sequential(engine: AnalysisEngine, dataset):
+    if not engine._validate_input(dataset):
+        return {"error": "Invalid input data format"}
+    results = []
+    for i in range(0, len(dataset), engine.batch_size):
+        results.append(await engine.processor.process_batch(dataset[i:i + engine.batch_size]))
+    return engine._compile_results(results)
+
+
+async def stream(dataset):
+    for value in dataset:
+        yield value
+
+
+def without_timestamp(result: dict) -> dict:
+    return {key: value for key, value in result.items() if key != 'timestamp'}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='AnalysisEngine scheduling benchmark')
+    parser.add_argument('--values', type=int, default=1_000_000)
+    parser.add_argument('--batch-size', type=int, default=10_000)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--process-workers', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    dataset = [rng.uniform(0, 30) for _ in range(args.values)]
+    scenarios = [
+        ('sequential', dict(), lambda engine: run_sequential(engine, dataset)),
+        ('scheduler', dict(concurrency=args.concurrency),
+         lambda engine: engine.run_analysis(dataset)),
+        ('process pool', dict(concurrency=args.concurrency, process_workers=args.process_workers),
+         lambda engine: engine.run_analysis(dataset)),
+        ('async generator', dict(concurrency=args.concurrency),
+         lambda engine: engine.run_analysis(stream(dataset))),
+    ]
+
+    expected = None
+    print(f"{args.values} values in batches of {args.batch_size}")
+    print(f"{'mode':<18}{'seconds':>10}")
+    for name, options, run in scenarios:
+        engine = AnalysisEngine(batch_size=args.batch_size, **options)
+        start = time.perf_counter()
+        result = without_timestamp(asyncio.run(run(engine)))
+        elapsed = time.perf_counter() - start
+        if expected is None:
+            expected = result
+        elif result != expected:
+            raise SystemExit(f"{name} compiled a different result: {result} != {expected}")
+        print(f"{name:<18}{elapsed:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
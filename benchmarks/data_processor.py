@@ -0,0 +1,109 @@
+"""Compare DataProcessor's vectorized batch engine with the coroutine-per-point path.
+
+Each size is processed as a single batch by a fresh processor in both
+modes; the results, including the type of every result value, are
+checked to be identical before timings are reported. One value in ten is
+an int, so a batch mixes ints and floats. The per-point path is skipped
+above --per-point-limit values.
+
+--memory also reports the bytes each stored point costs in the columnar
+PointStore against a list of the former per-point DataPoint dataclasses.
+
+Usage:
+    python -m benchmarks.data_processor --sizes 10000 100000 1000000 --memory
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+
+SAMPLE_PROJECT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              'data_analysis_project')
+sys.path.insert(0, SAMPLE_PROJECT)
+
+from data_processor import DataProcessor  # noqa: E402
+
+
+@dataclass
+class LegacyDataPoint:
+    """DataPoint as it was stored before the columnar store."""
+    value: float
+    timestamp: datetime
+    processed: bool = False
+
+
+def run_once(numbers, vectorized: bool) -> dict:
+    processor = DataProcessor(threshold=15.0, vectorized=vectorized)
+    start = time.perf_counter()
+    result = asyncio.run(processor.process_batch(numbers))
+    elapsed = time.perf_counter() - start
+    return {'seconds': elapsed, 'result': result, 'statistics': processor.get_statistics()}
+
+
+def traced_bytes(build) -> int:
+    """Bytes still allocated by the object `build` returns."""
+    tracemalloc.start()
+    kept = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+def report_memory(numbers):
+    count = len(numbers)
+    legacy = traced_bytes(lambda: [LegacyDataPoint(n, datetime.now(), n > 15.0) for n in numbers])
+
+    def columnar():
+        processor = DataProcessor(threshold=15.0)
+        processor.process_values(numbers)
+        return processor.data_points
+    allocated = traced_bytes(columnar)
+    store = columnar()
+    used = store.values.nbytes + store.timestamps.nbytes + store.processed.nbytes
+    print(f"\nBytes per stored point ({count} points)")
+    print(f"{'list of dataclasses':<24}{legacy / count:>10.1f}")
+    print(f"{'columnar, allocated':<24}{allocated / count:>10.1f}")
+    print(f"{'columnar, used':<24}{used / count:>10.1f}")
+
+
+def result_types(run: dict) -> list:
+    return [type(value) for value in run['result']['results']]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='DataProcessor batch benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--per-point-limit', type=int, default=1_000_000,
+                        help='Largest size to run through the coroutine-per-point path')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--memory', action='store_true', help='Also report bytes per stored point')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'values':>10}{'per-point s':>14}{'vectorized s':>14}{'speedup':>10}")
+    for size in args.sizes:
+        numbers = [rng.randrange(30) if i % 10 == 0 else rng.uniform(0, 30) for i in range(size)]
+        vectorized = run_once(numbers, vectorized=True)
+        if size > args.per_point_limit:
+            print(f"{size:>10}{'-':>14}{vectorized['seconds']:>14.3f}{'-':>10}")
+            continue
+        per_point = run_once(numbers, vectorized=False)
+        if (per_point['result'] != vectorized['result']
+                or result_types(per_point) != result_types(vectorized)
+                or per_point['statistics'] != vectorized['statistics']):
+            raise SystemExit(f"Results differ for {size} values")
+        speedup = per_point['seconds'] / vectorized['seconds']
+        print(f"{size:>10}{per_point['seconds']:>14.3f}{vectorized['seconds']:>14.3f}{speedup:>9.1f}x")
+
+    if args.memory:
+        report_memory([rng.uniform(0, 30) for _ in range(max(args.sizes))])
+
+
+if __name__ == "__main__":
+    main()
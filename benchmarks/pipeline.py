@@ -0,0 +1,154 @@
+"""Time each stage of the analysis pipeline on a synthetic project.
+
+Stages: parse (tree-sitter only), scan (single-pass walk producing
+complexity, operations and call data), summarize, dependency_graph,
+doc_generation, visualization and semantic (final.py's ast analysis).
+Each stage records wall time and the process's peak RSS after it ran;
+--tracemalloc also records the peak Python allocation of each stage.
+
+Usage:
+    python -m benchmarks.pipeline --files 200 --functions-per-file 20 --output bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict
+
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+from benchmarks.synthetic import SyntheticConfig, generate_project
+from code_analyzer import CodeAnalyzer, DependencyTracker
+from document_generator import DocumentationGenerator
+
+
+class StageTimer:
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.stages = {}
+
+    def run(self, name: str, func, *args):
+        if self.trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            result = func(*args)
+            record = {'seconds': round(time.perf_counter() - start, 4)}
+        except ImportError as e:
+            result = None
+            record = {'skipped': str(e)}
+        if self.trace_memory:
+            record['tracemalloc_peak_bytes'] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        record['peak_rss_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        self.stages[name] = record
+        return result
+
+
+def run_pipeline(project_dir: str, file_paths, work_dir: str, timer: StageTimer,
+                 skip_visualization: bool = False) -> dict:
+    analyzer = CodeAnalyzer(project_dir)
+
+    def parse():
+        for file_path in file_paths:
+            with open(file_path, 'rb') as f:
+                analyzer.parser.parse(f.read())
+
+    def scan():
+        return analyzer.scan_files(file_paths)
+
+    def summarize(analyses):
+        return [analyzer.summarize(analysis) for analysis in analyses]
+
+    def dependency_graph(analyses):
+        tracker = DependencyTracker(project_dir)
+        for analysis in analyses:
+            tracker.add_file_analysis(analysis)
+        tracker.resolve_calls()
+        return tracker
+
+    def doc_generation(summaries, tracker):
+        generator = DocumentationGenerator()
+        generator.doc_file = os.path.join(work_dir, 'project_documentation.md')
+        generator.stream_docs(summaries, tracker.dependency_graph, project_dir)
+
+    def visualization(tracker):
+        from code_visualizer import DependencyVisualizer
+        cwd = os.getcwd()
+        os.chdir(work_dir)
+        try:
+            DependencyVisualizer().create_visualization(tracker.dependency_graph)
+        finally:
+            os.chdir(cwd)
+
+    def semantic():
+        from final import CodeSemanticAnalyzer
+        for file_path in file_paths:
+            CodeSemanticAnalyzer(file_path).analyze_functions()
+
+    timer.run('parse', parse)
+    analyses = timer.run('scan', scan)
+    summaries = timer.run('summarize', summarize, analyses)
+    tracker = timer.run('dependency_graph', dependency_graph, analyses)
+    timer.run('doc_generation', doc_generation, summaries, tracker)
+    if not skip_visualization:
+        timer.run('visualization', visualization, tracker)
+    timer.run('semantic', semantic)
+
+    return {
+        'files': len(file_paths),
+        'functions': sum(len(analysis.functions) for analysis in analyses),
+        'graph_nodes': len(tracker.call_graph),
+        'graph_edges': tracker.call_graph.edge_count()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the analysis pipeline')
+    parser.add_argument('--files', type=int, default=50)
+    parser.add_argument('--functions-per-file', type=int, default=20)
+    parser.add_argument('--fan-out', type=int, default=3)
+    parser.add_argument('--nesting-depth', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--tracemalloc', action='store_true',
+                        help='Also record peak Python allocations per stage (slower)')
+    parser.add_argument('--skip-visualization', action='store_true',
+                        help='Leave out the visualization stage on very large graphs')
+    parser.add_argument('--output', help='Write the results as JSON to this file')
+    args = parser.parse_args()
+
+    config = SyntheticConfig(args.files, args.functions_per_file, args.fan_out,
+                             args.nesting_depth, args.seed)
+    timer = StageTimer(trace_memory=args.tracemalloc)
+    with tempfile.TemporaryDirectory() as work_dir:
+        file_paths = generate_project(work_dir, config)
+        totals = run_pipeline(work_dir, file_paths, work_dir, timer, args.skip_visualization)
+
+    results = {
+        'config': asdict(config),
+        'environment': {
+            'python': sys.version.split()[0],
+            'platform': platform.platform()
+        },
+        'totals': totals,
+        'stages': timer.stages
+    }
+
+    print(f"{'stage':<18}{'seconds':>10}{'peak RSS (MB)':>16}")
+    for name, record in timer.stages.items():
+        seconds = f"{record['seconds']:.3f}" if 'seconds' in record else 'skipped'
+        print(f"{name:<18}{seconds:>10}{record['peak_rss_kb'] / 1024:>16.1f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
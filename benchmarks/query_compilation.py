@@ -0,0 +1,117 @@
+"""Count tree-sitter query compilations with and without the query registry.
+
+The per-function query methods are timed with the registry disabled
+("before") and enabled ("after"); the single-pass scan from file_analysis
+is timed for comparison.
+
+Usage:
+    python -m benchmarks.query_compilation --functions 1000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from code_analyzer import CodeAnalyzer, DependencyTracker
+from query_registry import QUERY_REGISTRY, get_query
+
+FUNCTION_QUERY = "(function_definition body: (block) @function.body)"
+
+# The per-function queries CodeAnalyzer ran before the single-pass scan
+BRANCH_QUERY = """
+    (if_statement) @if
+    (for_statement) @for
+    (while_statement) @while
+    (try_statement) @try
+"""
+
+CALL_QUERY = "(call) @call"
+
+OPERATION_PATTERNS = {
+    'sorting': '(call function: (identifier) @sort)',
+    'arithmetic': '(binary_operator) @math',
+    'json': '(call function: (attribute object: (identifier)) @json)',
+    'list_ops': '(call function: (identifier) @list)',
+    'string_ops': '(call function: (identifier) @str)'
+}
+
+FUNCTION_TEMPLATE = '''
+def function_{index}(items, total=0):
+    """Synthetic function {index}."""
+    for item in sorted(items):
+        if item > {index}:
+            total = total + item * 2
+    return len(str(total))
+'''
+
+
+def write_synthetic_file(directory: str, num_functions: int) -> str:
+    file_path = os.path.join(directory, 'synthetic.py')
+    with open(file_path, 'w') as f:
+        f.write("import json\n")
+        for index in range(num_functions):
+            f.write(FUNCTION_TEMPLATE.format(index=index))
+    return file_path
+
+
+def analyze_function_complexity(language, node) -> dict:
+    branches = len(get_query(language, BRANCH_QUERY).captures(node))
+    calls = len(get_query(language, CALL_QUERY).captures(node))
+    return {'branches': branches, 'calls': calls, 'complexity_score': branches + calls}
+
+
+def analyze_operations(language, node) -> dict:
+    return {op_type: True for op_type, pattern in OPERATION_PATTERNS.items()
+            if get_query(language, pattern).captures(node)}
+
+
+def run_once(file_path: str, directory: str) -> dict:
+    QUERY_REGISTRY.reset_stats()
+    start = time.perf_counter()
+    analyzer = CodeAnalyzer(directory)
+    tracker = DependencyTracker()
+    with open(file_path, 'rb') as f:
+        tree = analyzer.parser.parse(f.read())
+    captures = get_query(analyzer.language, FUNCTION_QUERY).captures(tree.root_node)
+    for node, _ in captures:
+        analyze_function_complexity(analyzer.language, node)
+        analyze_operations(analyzer.language, node)
+        tracker.find_callees(node.parent)
+        tracker.find_variable_usage(node.parent)
+        tracker.find_modified_vars(node.parent)
+    elapsed = time.perf_counter() - start
+    return {'seconds': elapsed, 'compilations': QUERY_REGISTRY.compilations}
+
+
+def run_single_pass(file_path: str, directory: str) -> dict:
+    QUERY_REGISTRY.reset_stats()
+    start = time.perf_counter()
+    CodeAnalyzer(directory).scan_file(file_path)
+    elapsed = time.perf_counter() - start
+    return {'seconds': elapsed, 'compilations': QUERY_REGISTRY.compilations}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query compilation benchmark')
+    parser.add_argument('--functions', type=int, default=1000, help='Number of synthetic functions')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = write_synthetic_file(directory, args.functions)
+
+        with QUERY_REGISTRY.disabled():
+            before = run_once(file_path, directory)
+        QUERY_REGISTRY.clear()
+        after = run_once(file_path, directory)
+        single_pass = run_single_pass(file_path, directory)
+
+    scale = 1000 / args.functions
+    print(f"Functions analyzed: {args.functions}")
+    print(f"{'mode':<14}{'compilations':>14}{'sec / 1k functions':>22}")
+    print(f"{'before':<14}{before['compilations']:>14}{before['seconds'] * scale:>22.3f}")
+    print(f"{'after':<14}{after['compilations']:>14}{after['seconds'] * scale:>22.3f}")
+    print(f"{'single-pass':<14}{single_pass['compilations']:>14}{single_pass['seconds'] * scale:>22.3f}")
+
+
+if __name__ == "__main__":
+    main()
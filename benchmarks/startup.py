@@ -0,0 +1,98 @@
+"""Measure start-up time and which heavy libraries each entry point imports.
+
+Every scenario runs in a fresh interpreter. The child runs the script
+with runpy, then reports which of HEAVY_MODULES ended up in sys.modules;
+the parent records the best wall time over --repeat runs. Scenarios
+marked light must not import any heavy module, and --check makes that a
+failing exit status.
+
+Usage:
+    python -m benchmarks.startup --repeat 3 --check
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+HEAVY_MODULES = ['transformers', 'torch', 'langchain', 'langchain_community',
+                 'langchain_core', 'faiss', 'llama_cpp', 'sentence_transformers',
+                 'plotly', 'matplotlib']
+
+SAMPLE_PROJECT = 'data_analysis_project'
+
+# (name, script, arguments, light)
+SCENARIOS = [
+    ('code_analyzer --help', 'code_analyzer.py', ['--help'], True),
+    ('code_analyzer summary', 'code_analyzer.py',
+     ['--project-dir', SAMPLE_PROJECT, '--analysis-type', 'summary', '--no-cache'], True),
+    ('final --help', 'final.py', ['--help'], True),
+    ('import code_qa', 'code_qa.py', None, True),
+    ('import final', 'final.py', None, True),
+]
+
+
+def child(script: str, arguments):
+    """Run `script` (or just import it when arguments is None) and report imports."""
+    import runpy
+    devnull = open(os.devnull, 'w')
+    stdout, sys.stdout = sys.stdout, devnull
+    error = None
+    try:
+        if arguments is None:
+            runpy.run_path(script, run_name=os.path.splitext(os.path.basename(script))[0])
+        else:
+            sys.argv = [script] + arguments
+            runpy.run_path(script, run_name='__main__')
+    except SystemExit:
+        pass
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        sys.stdout = stdout
+    loaded = sorted(name for name in HEAVY_MODULES if name in sys.modules)
+    print(json.dumps({'loaded': loaded, 'error': error}))
+
+
+def run_scenario(script: str, arguments, repeat: int):
+    best, report = None, {}
+    command = [sys.executable, '-m', 'benchmarks.startup', '--child', script,
+               json.dumps(arguments)]
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        report = json.loads(output.strip().splitlines()[-1])
+    return best, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark start-up time of the entry points')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--check', action='store_true',
+                        help='Exit with status 1 if a light scenario imports a heavy module or fails')
+    parser.add_argument('--child', nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child[0], json.loads(args.child[1]))
+        return
+
+    failed = False
+    print(f"{'scenario':<26}{'seconds':>10}  heavy imports")
+    for name, script, arguments, light in SCENARIOS:
+        seconds, report = run_scenario(script, arguments, args.repeat)
+        loaded = report['loaded']
+        note = f" ({report['error']})" if report['error'] else ""
+        print(f"{name:<26}{seconds:>10.3f}  {', '.join(loaded) or '-'}{note}")
+        failed |= light and bool(loaded or report['error'])
+
+    if args.check and failed:
+        print("\nA light entry point imported a heavy module or failed")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
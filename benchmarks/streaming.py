@@ -0,0 +1,70 @@
+"""Stream binary and CSV files through AnalysisEngine.analyze_stream.
+
+The files are written chunk by chunk, so generating them does not raise
+the process's peak RSS; each format is then analyzed and its throughput
+and the peak RSS so far are reported. Peak RSS should not grow with
+--values.
+
+Usage:
+    python -m benchmarks.streaming --values 20000000
+"""
+import argparse
+import asyncio
+import os
+import resource
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+SAMPLE_PROJECT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              'data_analysis_project')
+sys.path.insert(0, SAMPLE_PROJECT)
+
+from analysis_engine import AnalysisEngine  # noqa: E402
+
+WRITE_CHUNK = 1 << 20
+
+
+def write_files(directory: str, count: int, seed: int):
+    rng = np.random.default_rng(seed)
+    binary_path = os.path.join(directory, 'values.f64')
+    csv_path = os.path.join(directory, 'values.csv')
+    with open(binary_path, 'wb') as binary, open(csv_path, 'w') as csv:
+        csv.write('value\n')
+        for start in range(0, count, WRITE_CHUNK):
+            chunk = rng.uniform(0, 30, min(WRITE_CHUNK, count - start))
+            chunk.tofile(binary)
+            np.savetxt(csv, chunk, fmt='%.6f')
+    return binary_path, csv_path
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Streaming ingestion benchmark')
+    parser.add_argument('--values', type=int, default=20_000_000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        binary_path, csv_path = write_files(directory, args.values, args.seed)
+        print(f"{args.values} values; peak RSS before streaming {peak_rss_mb():.0f} MB")
+        print(f"{'source':<10}{'MB':>8}{'seconds':>10}{'M values/s':>12}{'peak RSS MB':>13}")
+        for name, path, options in [('binary', binary_path, {}),
+                                    ('csv', csv_path, {})]:
+            engine = AnalysisEngine()
+            start = time.perf_counter()
+            result = asyncio.run(engine.analyze_stream(path, **options))
+            elapsed = time.perf_counter() - start
+            points = result['statistics']['total_points']
+            size = os.path.getsize(path) / 2 ** 20
+            print(f"{name:<10}{size:>8.0f}{elapsed:>10.2f}{points / elapsed / 1e6:>12.1f}"
+                  f"{peak_rss_mb():>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
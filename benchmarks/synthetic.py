@@ -0,0 +1,127 @@
+"""Generate synthetic Python projects for benchmarking the analyzers.
+
+Function bodies are seeded from the functions in data_analysis_project, so
+the generated code exercises the same constructs the tools are built for.
+
+Usage:
+    python -m benchmarks.synthetic --output /tmp/synthetic --files 200
+"""
+import argparse
+import ast
+import glob
+import os
+import random
+import textwrap
+from dataclasses import dataclass
+from typing import List
+
+SEED_PROJECT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            'data_analysis_project')
+
+NESTING_HEADERS = [
+    "for item_{level} in range(3):",
+    "if len(items) > {level}:",
+    "while False:",
+    "try:",
+]
+
+
+@dataclass
+class SyntheticConfig:
+    files: int = 50
+    functions_per_file: int = 20
+    fan_out: int = 3
+    nesting_depth: int = 2
+    seed: int = 0
+
+
+def load_seed_bodies(seed_project: str = SEED_PROJECT) -> List[str]:
+    bodies = []
+    for file_path in sorted(glob.glob(f"{seed_project}/**/*.py", recursive=True)):
+        with open(file_path, 'r', encoding='utf-8') as f:
+            code = f.read()
+        for node in ast.walk(ast.parse(code)):
+            # Async bodies are skipped: `await` is not valid in the plain
+            # functions generated here
+            if isinstance(node, ast.FunctionDef):
+                # Drop trailing returns so nesting and extra calls can follow
+                statements = [ast.get_source_segment(code, statement, padded=True)
+                              for statement in node.body
+                              if not isinstance(statement, ast.Return)]
+                body = "\n".join(textwrap.dedent(s) for s in statements if s)
+                if body.strip():
+                    bodies.append(body)
+    return bodies or ["pass"]
+
+
+def _wrap(body: str, depth: int) -> str:
+    lines = body.splitlines()
+    for level in reversed(range(depth)):
+        header = NESTING_HEADERS[level % len(NESTING_HEADERS)].format(level=level)
+        inner = textwrap.indent("\n".join(lines), "    ")
+        lines = [header] + inner.splitlines()
+        if header == "try:":
+            lines += ["except Exception:", "    pass"]
+    return "\n".join(lines)
+
+
+def generate_project(output_dir: str, config: SyntheticConfig) -> List[str]:
+    """Write `config.files` modules into output_dir and return their paths."""
+    rng = random.Random(config.seed)
+    bodies = load_seed_bodies()
+    package = os.path.join(output_dir, 'synthetic_project')
+    os.makedirs(package, exist_ok=True)
+
+    names = [[f"func_{file_index}_{function_index}"
+              for function_index in range(config.functions_per_file)]
+             for file_index in range(config.files)]
+
+    paths = []
+    for file_index in range(config.files):
+        imports = set()
+        functions = []
+        for function_index, name in enumerate(names[file_index]):
+            calls = []
+            for _ in range(config.fan_out):
+                target_file = rng.randrange(config.files)
+                target = names[target_file][rng.randrange(config.functions_per_file)]
+                if target_file != file_index:
+                    imports.add(f"from synthetic_project.module_{target_file} import {target}")
+                calls.append(f"{target}(items)")
+
+            body = _wrap(rng.choice(bodies) + "\n" + "\n".join(calls), config.nesting_depth)
+            functions.append(
+                f"def {name}(items, *args, **kwargs):\n"
+                f"    \"\"\"Synthetic function {file_index}.{function_index}.\"\"\"\n"
+                f"{textwrap.indent(body, '    ')}\n"
+                f"    return items\n"
+            )
+
+        file_path = os.path.join(package, f"module_{file_index}.py")
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(f"# Synthetic module {file_index}\n")
+            f.write("import json\n")
+            f.write("\n".join(sorted(imports)) + "\n\n\n")
+            f.write("\n\n".join(functions))
+        paths.append(file_path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic Python project')
+    parser.add_argument('--output', required=True, help='Directory to write the project into')
+    parser.add_argument('--files', type=int, default=50)
+    parser.add_argument('--functions-per-file', type=int, default=20)
+    parser.add_argument('--fan-out', type=int, default=3)
+    parser.add_argument('--nesting-depth', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    config = SyntheticConfig(args.files, args.functions_per_file, args.fan_out,
+                             args.nesting_depth, args.seed)
+    paths = generate_project(args.output, config)
+    print(f"Generated {len(paths)} files in {args.output}")
+
+
+if __name__ == "__main__":
+    main()
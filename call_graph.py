@@ -0,0 +1,219 @@
+import ast
+import os
+from array import array
+from collections import defaultdict, deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+def module_name(file_path: str, root: Optional[str] = None) -> str:
+    relative = os.path.relpath(file_path, root or os.getcwd())
+    module = os.path.splitext(relative)[0].replace(os.sep, '.')
+    if module.endswith('.__init__'):
+        module = module[:-len('.__init__')]
+    return module.lstrip('.')
+
+
+class CallResolver:
+    """Maps the bare names seen at call sites to qualified function names.
+
+    A call `foo()` made from `module.outer` resolves, in order, to a function
+    nested in an enclosing function, a top-level function of the same
+    module, or a function imported into the module. Anything else (builtins,
+    classes, third-party code) is left as the bare name.
+    """
+
+    def __init__(self):
+        self.functions: Set[str] = set()
+        self.modules: Set[str] = set()
+        self.imports: Dict[str, Dict[str, Tuple[str, str]]] = defaultdict(dict)
+        self.star_imports: Dict[str, List[str]] = defaultdict(list)
+        # Import target -> project module (None for stdlib/third-party),
+        # filled on first lookup and reset whenever a module is added
+        self._module_lookup: Dict[str, Optional[str]] = {}
+
+    def add_module(self, module: str, imports: List[str], qualnames: Iterable[str]):
+        self.modules.add(module)
+        self._module_lookup.clear()
+        self.functions.update(f"{module}.{qualname}" for qualname in qualnames)
+        for statement in imports:
+            try:
+                parsed = ast.parse(statement.strip())
+            except SyntaxError:
+                continue
+            for node in parsed.body:
+                if isinstance(node, ast.ImportFrom) and node.module:
+                    for alias in node.names:
+                        if alias.name == '*':
+                            self.star_imports[module].append(node.module)
+                        else:
+                            self.imports[module][alias.asname or alias.name] = (node.module, alias.name)
+
+    def _find_module(self, target: str) -> Optional[str]:
+        if target in self.modules:
+            return target
+        if target not in self._module_lookup:
+            suffix = f".{target}"
+            self._module_lookup[target] = next(
+                (module for module in sorted(self.modules) if module.endswith(suffix)), None)
+        return self._module_lookup[target]
+
+    def resolve(self, module: str, caller_qualname: str, name: str) -> str:
+        parts = caller_qualname.split('.')
+        for end in range(len(parts), 0, -1):
+            scope = f"{module}.{'.'.join(parts[:end])}"
+            candidate = f"{scope}.{name}"
+            if scope in self.functions and candidate in self.functions:
+                return candidate
+
+        candidate = f"{module}.{name}"
+        if candidate in self.functions:
+            return candidate
+
+        if name in self.imports[module]:
+            target, attr = self.imports[module][name]
+            found = self._find_module(target)
+            if found and f"{found}.{attr}" in self.functions:
+                return f"{found}.{attr}"
+
+        for target in self.star_imports[module]:
+            found = self._find_module(target)
+            if found and f"{found}.{name}" in self.functions:
+                return f"{found}.{name}"
+
+        return name
+
+
+class CallGraph:
+    """Bidirectional call graph over interned integer node IDs.
+
+    Forward and reverse adjacency are stored CSR-style in flat `array`s:
+    the neighbours of node i live in targets[offsets[i]:offsets[i + 1]].
+    Name lookups, callers and callees are O(1) plus the size of the answer.
+    """
+
+    def __init__(self):
+        self.names: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self._forward = (array('l', [0]), array('l'))
+        self._reverse = (array('l', [0]), array('l'))
+
+    def intern(self, name: str) -> int:
+        node_id = self.ids.get(name)
+        if node_id is None:
+            node_id = len(self.names)
+            self.ids[name] = node_id
+            self.names.append(name)
+        return node_id
+
+    @classmethod
+    def build(cls, nodes: Iterable[str], edges: Iterable[Tuple[str, str]]) -> 'CallGraph':
+        graph = cls()
+        for name in nodes:
+            graph.intern(name)
+        sources = array('l')
+        targets = array('l')
+        seen = set()
+        for caller, callee in edges:
+            edge = (graph.intern(caller), graph.intern(callee))
+            if edge not in seen:
+                seen.add(edge)
+                sources.append(edge[0])
+                targets.append(edge[1])
+
+        graph._forward = graph._compress(sources, targets)
+        graph._reverse = graph._compress(targets, sources)
+        return graph
+
+    def _compress(self, sources: array, targets: array) -> Tuple[array, array]:
+        count = len(self.names)
+        offsets = array('l', [0]) * (count + 1)
+        for source in sources:
+            offsets[source + 1] += 1
+        for i in range(count):
+            offsets[i + 1] += offsets[i]
+
+        position = array('l', offsets)
+        packed = array('l', [0]) * len(targets)
+        for source, target in zip(sources, targets):
+            packed[position[source]] = target
+            position[source] += 1
+        return offsets, packed
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.ids
+
+    def edge_count(self) -> int:
+        return len(self._forward[1])
+
+    def _neighbour_ids(self, adjacency: Tuple[array, array], node_id: int) -> array:
+        offsets, targets = adjacency
+        return targets[offsets[node_id]:offsets[node_id + 1]]
+
+    def callee_ids(self, node_id: int) -> array:
+        return self._neighbour_ids(self._forward, node_id)
+
+    def caller_ids(self, node_id: int) -> array:
+        return self._neighbour_ids(self._reverse, node_id)
+
+    def callees(self, name: str) -> List[str]:
+        if name not in self.ids:
+            return []
+        return [self.names[i] for i in self.callee_ids(self.ids[name])]
+
+    def callers(self, name: str) -> List[str]:
+        if name not in self.ids:
+            return []
+        return [self.names[i] for i in self.caller_ids(self.ids[name])]
+
+    def edges(self):
+        offsets, targets = self._forward
+        for source in range(len(self.names)):
+            for i in range(offsets[source], offsets[source + 1]):
+                yield self.names[source], self.names[targets[i]]
+
+    def traverse(self, start: Iterable[str], reverse: bool = False,
+                 max_depth: Optional[int] = None) -> Tuple[Dict[str, int], Dict[str, str]]:
+        """Breadth-first search from `start` along callee (or caller) edges.
+
+        Returns the hop distance of every reachable node and the node it was
+        reached from, which is enough to rebuild the shortest call chain.
+        """
+        adjacency = self._reverse if reverse else self._forward
+        offsets, targets = adjacency
+        distance = array('l', [-1]) * len(self.names)
+        parent = array('l', [-1]) * len(self.names)
+        queue = deque()
+        for name in start:
+            node_id = self.ids.get(name)
+            if node_id is not None and distance[node_id] < 0:
+                distance[node_id] = 0
+                queue.append(node_id)
+
+        while queue:
+            node_id = queue.popleft()
+            hops = distance[node_id] + 1
+            if max_depth is not None and hops > max_depth:
+                continue
+            for i in range(offsets[node_id], offsets[node_id + 1]):
+                neighbour = targets[i]
+                if distance[neighbour] < 0:
+                    distance[neighbour] = hops
+                    parent[neighbour] = node_id
+                    queue.append(neighbour)
+
+        reached = {self.names[i]: hops for i, hops in enumerate(distance) if hops >= 0}
+        parents = {self.names[i]: self.names[p] for i, p in enumerate(parent) if p >= 0}
+        return reached, parents
+
+    def transitive_callers(self, name: str) -> Set[str]:
+        reached, _ = self.traverse([name], reverse=True)
+        reached.pop(name, None)
+        return set(reached)
+
+    def transitive_callees(self, name: str) -> Set[str]:
+        reached, _ = self.traverse([name])
+        reached.pop(name, None)
+        return set(reached)
@@ -5,13 +5,28 @@ import os
 from pathlib import Path
 import glob
 import re  # For pattern matching
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import Dict, Set, List
-from code_visualizer import DependencyVisualizer
+from typing import Dict, Set, List, Iterable, Iterator, Optional, Tuple
+from query_registry import get_query
+from file_analysis import FileAnalysis, read_source, scan_file, scan_source
+from dependency_index import DependencyIndex
+from call_graph import CallGraph, CallResolver, module_name
+from profiling import PROFILER
+from analysis_cache import AnalysisCache, content_hash
+
+CALLEE_QUERY = "(call function: (identifier) @callee)"
+
+VARIABLE_QUERY = "(identifier) @var"
+
+MODIFIED_VAR_QUERY = "(assignment left: (identifier) @var)"
+
 
 class CodeAnalyzer:
-    def __init__(self, directory_path: str):
+    def __init__(self, directory_path: str, cache: AnalysisCache = None):
         self.directory = directory_path
+        self.cache = cache
         self.parser, self.language = self.setup_parser()
 
     def setup_parser(self):
@@ -21,50 +36,6 @@ class CodeAnalyzer:
         parser.set_language(language)
         return parser, language
 
-    def analyze_imports(self, node):
-        import_query = self.language.query("""
-        (import_statement) @import
-        (import_from_statement) @import_from
-        """)
-        imports = []
-        captures = import_query.captures(node)
-        for node, _ in captures:
-            imports.append(node.text.decode('utf8'))
-        return imports
-    def analyze_function_complexity(self, node):
-        branch_query = self.language.query("""
-            (if_statement) @if
-            (for_statement) @for
-            (while_statement) @while
-            (try_statement) @try
-        """)
-        branches = len(branch_query.captures(node))
-
-        call_query = self.language.query("(call) @call")
-        calls = len(call_query.captures(node))
-
-        return {
-            'branches': branches,
-            'calls': calls,
-            'complexity_score': branches + calls
-        }
-
-    def analyze_operations(self, node):
-        operation_patterns = {
-            'sorting': '(call function: (identifier) @sort)',
-            'arithmetic': '(binary_operator) @math',
-            'json': '(call function: (attribute object: (identifier)) @json)',
-            'list_ops': '(call function: (identifier) @list)',
-            'string_ops': '(call function: (identifier) @str)'
-        }
-        detected_ops = {}
-        for op_type, pattern in operation_patterns.items():
-            query = self.language.query(pattern)
-            if query.captures(node):
-                detected_ops[op_type] = True
-
-        return detected_ops
-
     def generate_accurate_description(self, func_name, operations):
         descriptions = []
         if operations.get('sorting'):
@@ -81,60 +52,127 @@ class CodeAnalyzer:
         return f"Function {func_name} " + " and ".join(descriptions) if descriptions else f"Function {func_name}"
 
     def analyze_file(self, file_path: str):
-        with open(file_path, 'r') as f:
-            code = f.read()
-        tree = self.parser.parse(bytes(code, "utf8"))
-
-        file_description_query = self.language.query("""
-            (module (comment)+ @file.doc)
-        """)
-
-        function_query = self.language.query("""
-            (function_definition 
-                name: (identifier) @function.name
-                body: (block 
-                    (expression_statement 
-                        (string) @function.doc))?
-                body: (block) @function.body)
-        """)
-
-        file_doc = ""
-        file_captures = file_description_query.captures(tree.root_node)
-        if file_captures:
-            file_doc = file_captures[0][0].text.decode('utf8').strip('# ')
+        return self.summarize(self.scan_file(file_path))
 
+    def scan_file(self, file_path: str) -> FileAnalysis:
+        return scan_file(self.parser, file_path)
+
+    def summarize(self, analysis: FileAnalysis):
+        with PROFILER.stage('summarize'):
+            return self._summarize(analysis)
+
+    def _summarize(self, analysis: FileAnalysis):
         functions = []
-        current_function = None
-        captures = function_query.captures(tree.root_node)
-
-        for node, capture_name in captures:
-            if capture_name == 'function.name':
-                current_function = {'name': node.text.decode('utf8')}
-            elif capture_name == 'function.doc' and current_function:
-                current_function['description'] = node.text.decode('utf8').strip('"""')
-            elif capture_name == 'function.body' and current_function:
-                current_function['complexity'] = self.analyze_function_complexity(node)
-                current_function['operations'] = self.analyze_operations(node)
-                current_function['description'] = self.generate_accurate_description(
-                    current_function['name'],
-                    current_function['operations']
-                )
-                functions.append(current_function)
-                current_function = None
+        for record in analysis.functions:
+            operations = record.operation_flags()
+            functions.append({
+                'name': record.name,
+                'complexity': record.complexity(),
+                'operations': operations,
+                'description': self.generate_accurate_description(record.name, operations)
+            })
 
         return {
-            'file': file_path,
-            'description': file_doc,
-            'imports': self.analyze_imports(tree.root_node),
+            'file': analysis.file_path,
+            'description': analysis.description,
+            'imports': analysis.imports,
             'functions': functions
         }
 
-    def analyze_directory(self):
-        results = []
-        python_files = glob.glob(f"{self.directory}/**/*.py", recursive=True)
-        for file in python_files:
-            results.append(self.analyze_file(file))
-        return results
+    def analyze_directory(self, jobs: int = 1):
+        return list(self.iter_analyze(jobs=jobs))
+
+    def iter_analyze(self, file_paths: List[str] = None, jobs: int = 1) -> Iterator[Dict]:
+        """Yield the analyze_file summary of each file as soon as it is ready.
+
+        Nothing but the current file's result is held, so memory stays flat
+        however large the project is.
+        """
+        if file_paths is None:
+            file_paths = glob.glob(f"{self.directory}/**/*.py", recursive=True)
+        for analysis in self.iter_scan(file_paths, jobs):
+            yield self.summarize(analysis)
+
+    def scan_files(self, file_paths: List[str], jobs: int = 1) -> List[FileAnalysis]:
+        return list(self.iter_scan(file_paths, jobs))
+
+    def iter_scan(self, file_paths: List[str], jobs: int = 1) -> Iterator[FileAnalysis]:
+        """Scan files, spreading them over `jobs` worker processes.
+
+        Results come back in the order of `file_paths` regardless of which
+        worker finished first, so the output is deterministic. With a cache,
+        only files whose content hash is not stored yet are parsed.
+        """
+        if self.cache is None:
+            yield from self._iter_uncached(file_paths, jobs)
+            return
+
+        # Each file is read once: the same bytes are hashed and, on a miss,
+        # parsed, so an entry can never be stored under another version's hash
+        def entries():
+            for file_path in file_paths:
+                source = read_source(file_path)
+                key = content_hash(source)
+                hit = self.cache.probe('file_analysis', key)
+                yield file_path, key, None if hit else source
+
+        for file_path, key, analysis in self._iter_misses(entries(), jobs):
+            if analysis is None:
+                analysis = FileAnalysis.from_dict(file_path, self.cache.get('file_analysis', key))
+            else:
+                self.cache.put('file_analysis', key, analysis.to_dict())
+            yield analysis
+
+    def _iter_misses(self, entries: Iterator[Tuple[str, str, Optional[bytes]]],
+                     jobs: int) -> Iterator[Tuple[str, str, Optional[FileAnalysis]]]:
+        # Entries with source bytes are parsed, the rest (cache hits) pass
+        # through as None; order is kept and the pool only starts on a miss
+        if jobs <= 1:
+            for file_path, key, source in entries:
+                yield file_path, key, None if source is None else scan_source(self.parser, source, file_path)
+            return
+
+        window = jobs * 4
+        pool = None
+        pending = deque()
+        try:
+            for file_path, key, source in entries:
+                future = None
+                if source is not None:
+                    if pool is None:
+                        pool = ProcessPoolExecutor(max_workers=jobs, initializer=_init_scan_worker,
+                                                   initargs=(self.directory,))
+                    future = pool.submit(_scan_source_in_worker, source, file_path)
+                pending.append((file_path, key, future))
+                if len(pending) >= window:
+                    file_path, key, future = pending.popleft()
+                    yield file_path, key, future and future.result()
+            while pending:
+                file_path, key, future = pending.popleft()
+                yield file_path, key, future and future.result()
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+    def _iter_uncached(self, file_paths: List[str], jobs: int) -> Iterator[FileAnalysis]:
+        if jobs <= 1 or len(file_paths) <= 1:
+            for file in file_paths:
+                yield self.scan_file(file)
+            return
+
+        # Keep a bounded window of submitted files so finished results never
+        # pile up ahead of the consumer
+        window = jobs * 4
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_scan_worker,
+                                 initargs=(self.directory,)) as pool:
+            pending = deque()
+            for file in file_paths:
+                pending.append(pool.submit(_scan_in_worker, file))
+                if len(pending) >= window:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
     def generate_file_summary(self, file_data):
         num_functions = len(file_data['functions'])
         total_complexity = sum(f['complexity']['complexity_score'] for f in file_data['functions'])
@@ -159,6 +197,23 @@ class CodeAnalyzer:
            f"Overall Complexity: {project_complexity}"
 
 
+# Each worker process builds its own Parser/Language once and reuses it
+_worker_analyzer = None
+
+
+def _init_scan_worker(directory_path: str):
+    global _worker_analyzer
+    _worker_analyzer = CodeAnalyzer(directory_path)
+
+
+def _scan_in_worker(file_path: str) -> FileAnalysis:
+    return _worker_analyzer.scan_file(file_path)
+
+
+def _scan_source_in_worker(source: bytes, file_path: str) -> FileAnalysis:
+    return scan_source(_worker_analyzer.parser, source, file_path)
+
+
 @dataclass
 class DependencyNode:
     name: str
@@ -169,25 +224,49 @@ class DependencyNode:
     variables_modified: Set[str]
 
 class DependencyTracker:
-    def __init__(self):
+    def __init__(self, project_dir: str = None):
+        # Functions are keyed by qualified name (module.Class.func), with
+        # modules named relative to project_dir (default: the working directory)
+        self.project_dir = project_dir
         self.dependency_graph: Dict[str, DependencyNode] = {}
+        self.call_graph = CallGraph()
+        self.resolver = CallResolver()
         self.current_file = None
+        self.index = None
+        self._raw_calls: Dict[str, tuple] = {}
         self.parser, self.language = self.setup_parser()
 
-    def find_callers(self, node):
-        query = self.language.query("""
-            (call function: (identifier) @caller)
-        """)
-        callers = set()
-        captures = query.captures(node)
-        for n, _ in captures:
-            callers.add(n.text.decode('utf8'))
-        return callers
+    def find_callers(self, function):
+        """Qualified callers of a function, from the resolved call graph.
+
+        `function` is a qualified name, a bare name (callers of every
+        function of that name) or, as before, the function's tree-sitter
+        node. Callers cannot be read off the function's own subtree.
+        """
+        if not isinstance(function, str):
+            function = self._qualified_name(function)
+        if function in self.call_graph:
+            return set(self.call_graph.callers(function))
+        suffix = f".{function}"
+        return {caller for name in self.dependency_graph if name.endswith(suffix)
+                for caller in self.call_graph.callers(name)}
+
+    def _qualified_name(self, node, function_name: str = None) -> str:
+        # module.Class.func from the definitions enclosing `node`
+        if node.type != 'function_definition' and node.parent is not None:
+            node = node.parent
+        scopes = []
+        while node is not None:
+            if node.type in ('function_definition', 'class_definition'):
+                scopes.append(node.child_by_field_name('name').text.decode('utf8'))
+            node = node.parent
+        if function_name and not scopes:
+            scopes = [function_name]
+        module = module_name(self.current_file, self.project_dir) if self.current_file else None
+        return '.'.join(([module] if module else []) + list(reversed(scopes)))
 
     def find_callees(self, node):
-        query = self.language.query("""
-            (call function: (identifier) @callee)
-        """)
+        query = get_query(self.language, CALLEE_QUERY)
         callees = set()
         captures = query.captures(node)
         for n, _ in captures:
@@ -195,9 +274,7 @@ class DependencyTracker:
         return callees
 
     def find_variable_usage(self, node):
-        query = self.language.query("""
-            (identifier) @var
-        """)
+        query = get_query(self.language, VARIABLE_QUERY)
         variables = set()
         captures = query.captures(node)
         for n, _ in captures:
@@ -205,9 +282,7 @@ class DependencyTracker:
         return variables
 
     def find_modified_vars(self, node):
-        query = self.language.query("""
-            (assignment left: (identifier) @var)
-        """)
+        query = get_query(self.language, MODIFIED_VAR_QUERY)
         modified = set()
         captures = query.captures(node)
         for n, _ in captures:
@@ -222,54 +297,194 @@ class DependencyTracker:
         return parser, language
 
     def analyze_function_dependencies(self, node, function_name):
-        callers = self.find_callers(node)
-        callees = self.find_callees(node)
-        vars_used = self.find_variable_usage(node)
-
-        self.dependency_graph[function_name] = DependencyNode(
+        """Add one function from its node, keyed by qualified name like
+        add_file_analysis; call resolve_calls() once all functions are in."""
+        qualified_name = self._qualified_name(node, function_name)
+        module = module_name(self.current_file, self.project_dir) if self.current_file else ''
+        qualname = qualified_name[len(module) + 1:] if module else qualified_name
+        callees = sorted(self.find_callees(node))
+        imports = []
+        if module not in self.resolver.modules:
+            # Register the file's imports with its first function
+            root = node
+            while root.parent is not None:
+                root = root.parent
+            imports = [child.text.decode('utf8') for child in root.children
+                       if child.type in ('import_statement', 'import_from_statement')]
+        self.resolver.add_module(module, imports, [qualname])
+        self._raw_calls[qualified_name] = (module, qualname, callees)
+        self.dependency_graph[qualified_name] = DependencyNode(
             name=function_name,
             file_path=self.current_file,
-            callers=callers,
-            callees=callees,
-            variables_used=vars_used,
+            callers=self.find_callers(qualified_name),
+            callees=set(callees),
+            variables_used=self.find_variable_usage(node),
             variables_modified=self.find_modified_vars(node)
         )
     def analyze_files(self, file_paths):
         for file_path in file_paths:
-            self.current_file = file_path
-            with open(file_path, 'r') as f:  # Remove the hardcoded directory prefix
-                code = f.read()
-            tree = self.parser.parse(bytes(code, "utf8"))
+            self.add_file_analysis(scan_file(self.parser, file_path))
+        self.resolve_calls()
 
+        return self.dependency_graph
 
-            # Get all functions in the file
-            function_query = self.language.query("""
-            (function_definition 
-                name: (identifier) @function.name
-                body: (block) @function.body)
-            """)
+    def add_file_analysis(self, analysis: FileAnalysis):
+        """Add a file's functions; call resolve_calls() once all files are in."""
+        self.current_file = analysis.file_path
+        module = module_name(analysis.file_path, self.project_dir)
+        self.resolver.add_module(module, analysis.imports,
+                                 [record.qualname for record in analysis.functions])
+        # Sets are rebuilt in sorted order so that graphs merged from worker
+        # processes iterate exactly like graphs built in-process
+        for record in analysis.functions:
+            qualified_name = f"{module}.{record.qualname}"
+            self._raw_calls[qualified_name] = (module, record.qualname, sorted(record.callees))
+            self.dependency_graph[qualified_name] = DependencyNode(
+                name=record.name,
+                file_path=analysis.file_path,
+                callers=set(),
+                callees=set(sorted(record.callees)),
+                variables_used=set(sorted(record.variables_used)),
+                variables_modified=set(sorted(record.variables_modified))
+            )
+
+    def resolve_calls(self):
+        """Resolve call sites to qualified names and index both directions."""
+        with PROFILER.stage('resolve_calls'):
+            return self._resolve_calls()
+
+    def _resolve_calls(self):
+        edges = []
+        for qualified_name, (module, qualname, callees) in self._raw_calls.items():
+            for callee in callees:
+                edges.append((qualified_name, self.resolver.resolve(module, qualname, callee)))
+        self.call_graph = CallGraph.build(self.dependency_graph, edges)
+
+        for qualified_name, deps in self.dependency_graph.items():
+            deps.callees = set(sorted(self.call_graph.callees(qualified_name)))
+            deps.callers = set(sorted(self.call_graph.callers(qualified_name)))
+        return self.call_graph
 
-            captures = function_query.captures(tree.root_node)
-            for node, capture_name in captures:
-                if capture_name == 'function.name':
-                    function_name = node.text.decode('utf8')
-                    self.analyze_function_dependencies(node.parent, function_name)
+    def generate_impact_report(self, modified_functions: List[str]):
+        function_files = {func: deps.file_path for func, deps in self.dependency_graph.items()}
+        impact = self.trace_impact(modified_functions, self.call_graph, function_files)
+        return self.format_report(impact)
 
-        return self.dependency_graph
+    def analyze_impact(self, modified_files: List[str], index: DependencyIndex = None,
+                       sources: Dict[str, Optional[bytes]] = None):
+        """Report which functions are affected by changes to `modified_files`.
+
+        Only the modified files are parsed; the rest of the call graph comes
+        from the saved index. With `sources`, each file is parsed from the
+        bytes given for its path (None for a deleted file) instead of being
+        read from disk, so the pre-commit hook can check the staged content.
+        The index is updated in memory, call save_index() once the change is
+        accepted.
+        """
+        with PROFILER.stage('impact_analysis'):
+            return self._analyze_impact(modified_files, index, sources)
+
+    def _analyze_impact(self, modified_files: List[str], index: DependencyIndex = None,
+                        sources: Dict[str, Optional[bytes]] = None):
+        self.index = index or DependencyIndex.load()
+        changed_functions = []
+        removed_names = []
+        for file_path in modified_files:
+            if not file_path.endswith('.py'):
+                continue
+            previous = self.index.digests(file_path)
+            if sources is not None:
+                source = sources.get(file_path)
+                analysis = scan_source(self.parser, source, file_path) if source is not None else None
+            elif os.path.exists(file_path):
+                analysis = scan_file(self.parser, file_path)
+            else:
+                analysis = None
+            if analysis is not None:
+                self.index.update(analysis, module_name(file_path, self.project_dir))
+                current = self.index.digests(file_path)
+            else:
+                self.index.remove(file_path)
+                current = {}
+            changed = sorted(name for name in set(previous) | set(current)
+                             if previous.get(name) != current.get(name))
+            changed_functions.extend(changed)
+            # Calls to a deleted function no longer resolve, so they show up
+            # under its bare name
+            removed_names.extend(name.rsplit('.', 1)[-1] for name in changed if name not in current)
+
+        self.call_graph = self.index.call_graph()
+        impact = self.trace_impact(changed_functions, self.call_graph,
+                                   self.index.function_files(), removed_names)
+        return self.format_report(impact)
 
-    def generate_impact_report(self, modified_functions: List[str]):
+    def trace_impact(self, changed_functions: List[str], call_graph: CallGraph,
+                     function_files: Dict[str, str], removed_names: List[str] = ()):
+        # Breadth-first search over caller edges: direct callers are high
+        # risk, their callers medium risk and anything further away low risk
         impact = {
+            'changed_functions': list(changed_functions),
+            'direct_callers': {},
             'high_risk': [],
             'medium_risk': [],
             'low_risk': [],
             'affected_tests': set(),
             'cascade_effects': []
         }
+        start = list(changed_functions) + list(removed_names)
+        distance, parent = call_graph.traverse(start, reverse=True)
+
+        for func in changed_functions:
+            impact['direct_callers'][func] = sorted(call_graph.callers(func))
+        for name in removed_names:
+            for func in changed_functions:
+                if func.rsplit('.', 1)[-1] == name:
+                    impact['direct_callers'][func].extend(sorted(call_graph.callers(name)))
+
+        for func, hops in sorted(distance.items(), key=lambda item: (item[1], item[0])):
+            if hops == 0:
+                continue
+            if hops == 1:
+                impact['high_risk'].append(func)
+            elif hops == 2:
+                impact['medium_risk'].append(func)
+            else:
+                impact['low_risk'].append(func)
+
+            file_path = function_files.get(func, '')
+            if func.startswith('test_') or os.path.basename(file_path).startswith('test_'):
+                impact['affected_tests'].add(func)
+            if hops > 1:
+                chain = [func]
+                while chain[-1] in parent:
+                    chain.append(parent[chain[-1]])
+                impact['cascade_effects'].append(' -> '.join(reversed(chain)))
+
+        return impact
+
+    def format_report(self, impact):
+        return {
+            'changed_functions': impact['changed_functions'],
+            'high_risk_changes': {func: callers
+                                  for func, callers in impact['direct_callers'].items() if callers},
+            'high_risk': sorted(impact['high_risk']),
+            'medium_risk': sorted(impact['medium_risk']),
+            'low_risk': sorted(impact['low_risk']),
+            'affected_tests': sorted(impact['affected_tests']),
+            'cascade_effects': impact['cascade_effects']
+        }
 
-        for func in modified_functions:
-            self.analyze_impact(func, impact)
+    def build_index(self, sources: Iterable[Tuple[str, bytes]], index: DependencyIndex = None):
+        self.index = index or DependencyIndex()
+        for file_path, source in sources:
+            self.index.update(scan_source(self.parser, source, file_path),
+                              module_name(file_path, self.project_dir))
+        self.index.save()
+        return self.index
 
-        return self.format_report(impact)
+    def save_index(self):
+        if self.index is not None:
+            self.index.save()
 
 def display_summary_results(results):
     for result in results:
@@ -296,31 +511,87 @@ if __name__ == "__main__":
     parser.add_argument('--project-dir', required=True, help='Path to the Python project directory')
     parser.add_argument('--analysis-type', choices=['summary', 'dependency', 'all'],
                        default='all', help='Type of analysis to perform')
+    parser.add_argument('--jobs', type=int, default=1,
+                       help='Number of worker processes for parsing (0 uses all cores)')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Re-parse every file instead of using the on-disk analysis cache')
+    parser.add_argument('--profile', nargs='?', const='profile_trace.json', metavar='TRACE_FILE',
+                       help='Print per-stage timings and write a Chrome trace '
+                            '(worker processes started by --jobs are not traced)')
+    parser.add_argument('--viz-layout', choices=['auto', 'spring', 'hierarchical'], default='auto',
+                       help='Graph layout (auto switches to hierarchical for large graphs)')
+    parser.add_argument('--collapse-modules', action='store_true',
+                       help='Draw one node per module instead of one per function')
+    parser.add_argument('--viz-formats', default='html,png,svg',
+                       help='Comma-separated graph outputs to write: html, png, svg (empty for none)')
+    parser.add_argument('--viz-output-dir', default='.',
+                       help='Directory for the dependency graph files')
     args = parser.parse_args()
+    viz_formats = list(dict.fromkeys(name.strip() for name in args.viz_formats.split(',')
+                                     if name.strip()))
+    if args.analysis_type in ['dependency', 'all']:
+        # plotly and matplotlib are only imported when a graph is drawn
+        from code_visualizer import DependencyVisualizer, FORMATS
+        unknown = [name for name in viz_formats if name not in FORMATS]
+        if unknown:
+            parser.error(f"--viz-formats: unknown format(s) {', '.join(unknown)} "
+                         f"(choose from {', '.join(FORMATS)})")
+    if args.profile:
+        PROFILER.enable()
+    jobs = args.jobs or os.cpu_count()
+    cache = None if args.no_cache else AnalysisCache()
 
     python_files = glob.glob(f"{args.project_dir}/**/*.py", recursive=True)
 
+    # Parse every file once and stream it: each result is printed, added to
+    # the dependency graph and written to the docs before the next is read
+    analyzer = CodeAnalyzer(args.project_dir, cache=cache)
+    tracker = DependencyTracker(args.project_dir)
+
+    def stream_summaries():
+        for analysis in analyzer.iter_scan(python_files, jobs):
+            tracker.add_file_analysis(analysis)
+            summary = analyzer.summarize(analysis)
+            if args.analysis_type in ['summary', 'all']:
+                display_summary_results([summary])
+            yield summary
+        tracker.resolve_calls()
+
     if args.analysis_type in ['summary', 'all']:
         print("\nCode Summary Analysis:")
         print("=====================")
-        analyzer = CodeAnalyzer(args.project_dir)
-        summary_results = analyzer.analyze_directory()
-        display_summary_results(summary_results)
+
+    if args.analysis_type == 'summary':
+        for _ in stream_summaries():
+            pass
 
     if args.analysis_type in ['dependency', 'all']:
+        doc_generator = DocumentationGenerator()
+        doc_generator.stream_docs(stream_summaries(), tracker.dependency_graph, args.project_dir)
+
         print("\nDependency Analysis:")
         print("===================")
-        tracker = DependencyTracker()
-        dep_results = tracker.analyze_files(python_files)
+        dep_results = tracker.dependency_graph
         display_dependency_results(dep_results)
 
-    if args.analysis_type in ['dependency', 'all']:
-        visualizer = DependencyVisualizer()
-        visualizer.create_visualization(dep_results)
-        doc_generator = DocumentationGenerator()
-        doc_generator.generate_docs(summary_results, dep_results, args.project_dir)
+        visualizer = DependencyVisualizer(layout=args.viz_layout,
+                                          collapse_modules=args.collapse_modules, cache=cache)
+        for path in visualizer.create_visualization(dep_results, viz_formats,
+                                                    args.viz_output_dir).values():
+            print(f"Graph written: {path}")
         print(f"\nDocumentation generated: {doc_generator.doc_file}")
 
+    if cache is not None:
+        print(f"\n{cache.stats()}")
+        PROFILER.count('cache_hits', cache.hits)
+        PROFILER.count('cache_misses', cache.misses)
+        cache.close()
+
+    if args.profile:
+        print(f"\nProfile:\n{PROFILER.summary()}")
+        PROFILER.write_trace(args.profile)
+        print(f"Trace written to {args.profile}")
+
 """
 python code_analyzer.py --project-dir test_dependency --analysis-type summary
 python code_analyzer.py --project-dir test_dependency --analysis-type dependency
@@ -0,0 +1,115 @@
+import ast
+from dataclasses import dataclass
+from typing import List, Optional
+
+from call_graph import module_name
+
+# Bump when chunk boundaries or metadata change so saved indexes are rebuilt
+CHUNKER_VERSION = "2"
+
+DEFAULT_MAX_LINES = 80
+
+
+@dataclass
+class CodeChunk:
+    text: str
+    file_path: str
+    qualified_name: str
+    kind: str
+    start_line: int
+    end_line: int
+
+    def metadata(self) -> dict:
+        return {
+            'source': self.file_path,
+            'qualified_name': self.qualified_name,
+            'kind': self.kind,
+            'start_line': self.start_line,
+            'end_line': self.end_line
+        }
+
+
+class CodeChunker:
+    """Split Python sources at function and class boundaries.
+
+    Every top-level function becomes a chunk; a class becomes one chunk if it
+    fits in `max_lines`, otherwise each method and the class-level code
+    between them are chunked separately. Module-level code between definitions is grouped into
+    chunks of its own, and anything still longer than `max_lines` is cut
+    into windows so no chunk overflows the model's context.
+    """
+
+    def __init__(self, max_lines: int = DEFAULT_MAX_LINES, root: Optional[str] = None):
+        self.max_lines = max_lines
+        self.root = root
+
+    def chunk_file(self, file_path: str) -> List[CodeChunk]:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            code = f.read()
+        return self.chunk_source(code, file_path)
+
+    def chunk_source(self, code: str, file_path: str) -> List[CodeChunk]:
+        lines = code.splitlines()
+        module = module_name(file_path, self.root)
+        try:
+            tree = ast.parse(code)
+        except SyntaxError:
+            return self._windows(lines, file_path, module, 'module', 1, len(lines))
+
+        chunks = []
+        pending_start = None
+        for node in tree.body:
+            start, end = self._span(node)
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                if pending_start is not None:
+                    chunks += self._windows(lines, file_path, module, 'module', pending_start, start - 1)
+                    pending_start = None
+                chunks += self._definition(node, lines, file_path, module)
+            elif pending_start is None:
+                pending_start = start
+        if pending_start is not None:
+            chunks += self._windows(lines, file_path, module, 'module', pending_start, len(lines))
+        return chunks
+
+    def _span(self, node) -> tuple:
+        start = min([node.lineno] + [d.lineno for d in getattr(node, 'decorator_list', [])])
+        return start, node.end_lineno
+
+    def _definition(self, node, lines, file_path, prefix) -> List[CodeChunk]:
+        start, end = self._span(node)
+        qualified_name = f"{prefix}.{node.name}"
+        if not isinstance(node, ast.ClassDef):
+            return self._windows(lines, file_path, qualified_name, 'function', start, end)
+        if end - start + 1 <= self.max_lines:
+            return self._windows(lines, file_path, qualified_name, 'class', start, end)
+
+        # Large class: each method is chunked on its own, and the class
+        # statements around them (header, attributes, nested blocks) are
+        # grouped like module-level code
+        chunks = []
+        pending_start = start
+        for child in node.body:
+            child_start, _ = self._span(child)
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                if pending_start is not None:
+                    chunks += self._windows(lines, file_path, qualified_name, 'class',
+                                            pending_start, child_start - 1)
+                    pending_start = None
+                chunks += self._definition(child, lines, file_path, qualified_name)
+            elif pending_start is None:
+                pending_start = child_start
+        if pending_start is not None:
+            chunks += self._windows(lines, file_path, qualified_name, 'class', pending_start, end)
+        return chunks
+
+    def _windows(self, lines, file_path, qualified_name, kind, start, end) -> List[CodeChunk]:
+        chunks = []
+        for window_start in range(start, end + 1, self.max_lines):
+            window_end = min(end, window_start + self.max_lines - 1)
+            body = "\n".join(lines[window_start - 1:window_end])
+            if not body.strip():
+                continue
+            header = f"# {file_path}:{window_start}-{window_end} {qualified_name}\n"
+            chunks.append(CodeChunk(header + body, file_path, qualified_name, kind,
+                                    window_start, window_end))
+        return chunks
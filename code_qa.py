@@ -1,39 +1,179 @@
-from langchain_community.llms import LlamaCpp
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_community.vectorstores import FAISS
-from langchain.chains import RetrievalQA
-from langchain_community.document_loaders import TextLoader
-from langchain_community.embeddings import HuggingFaceEmbeddings
+# langchain, the models and FAISS are imported where they are first needed
+# so that starting up (and --help) stays fast
+from vector_index import PersistentVectorIndex, default_index_dir
+from answer_cache import ANSWER_CACHE_FILE, AnswerCache
+from analysis_cache import DEFAULT_CACHE_PATH, AnalysisCache
+from code_chunker import CHUNKER_VERSION, CodeChunker
+from ingestion import DEFAULT_BATCH_SIZE, DEFAULT_READ_WORKERS, print_progress
 import os
+import threading
+
+MODEL_PATH = "models/llama-2-7b-chat.gguf"
+
+
+def _load_llm():
+    from langchain_community.llms import LlamaCpp
+    return LlamaCpp(
+        model_path=MODEL_PATH,
+        n_ctx=2048,  # Increased context window
+        max_tokens=2048  # Maximum tokens for response
+    )
+
+
+def _load_embeddings():
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+    return HuggingFaceEmbeddings()
+
 
 class CodeQASystem:
-    def __init__(self):
-        model_path = "models/llama-2-7b-chat.gguf"
-        self.llm = LlamaCpp(
-            model_path=model_path,
-            n_ctx=2048,  # Increased context window
-            max_tokens=2048  # Maximum tokens for response
+    def __init__(self, llm=None, embeddings=None, warm_up: bool = False):
+        # Models are loaded on first use; warm_up() loads them in the background
+        self._llm = llm
+        self._embeddings = embeddings
+        self._llm_lock = threading.Lock()
+        self._embeddings_lock = threading.Lock()
+        self.chunker = CodeChunker()
+        self.index = None
+        self.answer_cache = None
+        self.symbols = None
+        self.retriever = None
+        self._qa_chain = None
+        if warm_up:
+            self.warm_up()
+
+    @property
+    def llm(self):
+        with self._llm_lock:
+            if self._llm is None:
+                self._llm = _load_llm()
+        return self._llm
+
+    @property
+    def embeddings(self):
+        with self._embeddings_lock:
+            if self._embeddings is None:
+                self._embeddings = _load_embeddings()
+        return self._embeddings
+
+    @property
+    def qa_chain(self):
+        if self._qa_chain is None and self.retriever is not None:
+            from langchain.chains import RetrievalQA
+            self._qa_chain = RetrievalQA.from_chain_type(
+                llm=self.llm,
+                chain_type="stuff",
+                retriever=self.retriever
+            )
+        return self._qa_chain
+
+    def warm_up(self) -> threading.Thread:
+        # Embeddings first: indexing needs them before the LLM is ever used
+        def load():
+            try:
+                self.embeddings
+                self.llm
+            except Exception:
+                pass  # raised again, in the caller's thread, on first real use
+        thread = threading.Thread(target=load, name="code-qa-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def load_codebase(self, project_path: str, index_dir: str = None,
+                      batch_size: int = DEFAULT_BATCH_SIZE, read_workers: int = DEFAULT_READ_WORKERS):
+        # The index is kept on disk; only added, changed or deleted files
+        # are re-embedded on later starts
+        self.chunker.root = project_path
+        self.index = PersistentVectorIndex(
+            self.embeddings,
+            index_dir or default_index_dir(project_path),
+            self._load_documents,
+            loader_version=CHUNKER_VERSION,
+            batch_size=batch_size,
+            read_workers=read_workers,
+            progress=print_progress
         )
-        self.embeddings = HuggingFaceEmbeddings()
-        self.qa_chain = None
-
-    def load_codebase(self, project_path: str):
-        documents = []
-        for file_path in self._get_python_files(project_path):
-            loader = TextLoader(file_path)
-            documents.extend(loader.load())
-
-        vectorstore = FAISS.from_documents(documents, self.embeddings)
-        self.qa_chain = RetrievalQA.from_chain_type(
-            llm=self.llm,
-            chain_type="stuff",
-            retriever=vectorstore.as_retriever()
+        python_files = self._get_python_files(project_path)
+        changes = self.index.sync(python_files)
+        print(f"Index: {changes['added']} added, {changes['changed']} changed, "
+              f"{changes['removed']} removed, {changes['unchanged']} unchanged")
+        stats = self.index.last_ingestion
+        if stats.chunks:
+            print(f"Embedded {stats.chunks} chunks in {stats.seconds:.1f}s "
+                  f"({stats.chunks_per_second:.1f} chunks/s)")
+
+        # Cached answers live next to the index and are dropped when a file
+        # they were retrieved from has changed
+        self.answer_cache = AnswerCache(
+            os.path.join(self.index.index_dir, ANSWER_CACHE_FILE),
+            self.index.version
         )
+        self.answer_cache.load(self.index.file_hashes())
+
+        # Exact function table for navigation questions, and BM25 over
+        # identifiers alongside the dense index for everything else
+        from hybrid_retriever import HybridRetriever
+        from symbol_index import SymbolIndex
+        # Kept with the index rather than in whatever directory we started in
+        cache = AnalysisCache(os.path.join(self.index.index_dir, DEFAULT_CACHE_PATH))
+        try:
+            self.symbols = SymbolIndex.build(project_path, python_files, cache)
+        finally:
+            # Commits the scans and releases the database for other analyzer runs
+            cache.close()
+        self.retriever = HybridRetriever.from_vectorstore(self.index.vectorstore, self.symbols)
+        self._qa_chain = None
 
     def ask_question(self, question: str) -> str:
-        if not self.qa_chain:
-            return "Please load a codebase first."
-        return self.qa_chain.run(question)
+        return "".join(self.stream_answer(question))
+
+    def stream_answer(self, question: str):
+        """Yield the answer token by token as the LLM generates it."""
+        if self.retriever is None:
+            yield "Please load a codebase first."
+            return
+        # Navigation questions are answered from the symbol index, no LLM
+        direct = self.symbols.answer(question)
+        if direct is not None:
+            yield direct
+            return
+        file_hashes = self.index.file_hashes()
+        # Exact hits skip the embedding; only a miss pays for embed_query
+        answer = self.answer_cache.get_exact(question, file_hashes)
+        embedding = None
+        if answer is None:
+            embedding = self.embeddings.embed_query(question)
+            answer = self.answer_cache.get_similar(embedding, file_hashes)
+        if answer is not None:
+            yield answer
+            return
+
+        # Same retrieval and "stuff" prompt as qa_chain, but streamed
+        from langchain_core.prompts import format_document
+        # The question was embedded for the semantic cache; reuse it
+        documents = self.retriever.retrieve(question, embedding)
+        chain = self.qa_chain.combine_documents_chain
+        context = chain.document_separator.join(
+            format_document(doc, chain.document_prompt) for doc in documents
+        )
+        prompt = chain.llm_chain.prompt.format(
+            **{chain.document_variable_name: context, "question": question}
+        )
+        tokens = []
+        for token in self.llm.stream(prompt):
+            tokens.append(token)
+            yield token
+
+        sources = {doc.metadata['source']: file_hashes[doc.metadata['source']]
+                   for doc in documents if doc.metadata.get('source') in file_hashes}
+        self.answer_cache.put(question, embedding, "".join(tokens), sources)
+        self.answer_cache.save()
+
+    def _load_documents(self, file_path: str) -> list:
+        # One document per function/class chunk instead of one per file, so
+        # retrieval returns just the relevant code and prompts stay short
+        from langchain_core.documents import Document
+        return [Document(page_content=chunk.text, metadata=chunk.metadata())
+                for chunk in self.chunker.chunk_file(file_path)]
 
     def _get_python_files(self, directory: str) -> list:
         python_files = []
@@ -44,8 +184,8 @@ class CodeQASystem:
         return python_files
 
 def main():
-    # Initialize the QA system
-    qa_system = CodeQASystem()
+    # Initialize the QA system; the models load while the user types
+    qa_system = CodeQASystem(warm_up=True)
 
     # Get directory path from user
     project_path = input("Enter the path to your code directory: ")
@@ -1,100 +1,283 @@
+import os
 import networkx as nx
-import plotly.graph_objects as go
-from typing import Dict, Set
-import matplotlib.pyplot as plt
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Set, Tuple
+from analysis_cache import AnalysisCache
+from graph_layout import (collapse_clusters, graph_digest, hierarchical_layout,
+                          module_clusters, project_root)
+from profiling import PROFILER
 
-class DependencyVisualizer:
-    def __init__(self):
-        self.graph = nx.DiGraph()
+# Above this many nodes the O(n²) spring layout gives way to the layered one
+SPRING_LAYOUT_LIMIT = 500
+# Above this many nodes plotly draws with WebGL and labels only on hover
+WEBGL_THRESHOLD = 1000
+# Above this many nodes the static image leaves out labels, and above this
+# many edges it draws one line collection instead of an arrow patch per edge
+LABEL_LIMIT = 200
+ARROW_LIMIT = 1000
 
-    def calculate_node_colors(self, dependency_data):
-        colors = []
-        for node in self.graph.nodes():
-            if node in dependency_data:
-                deps = dependency_data[node]
-                complexity = len(deps.callees) + len(deps.variables_used)
-                if complexity > 8:
-                    colors.append('red')        # High complexity
-                elif complexity > 4:
-                    colors.append('yellow')     # Medium complexity
-                else:
-                    colors.append('lightgreen') # Low complexity
-            else:
-                colors.append('gray')  # Built-in functions
-        return colors
+# Complexity levels: built-in, low, medium, high
+LEVEL_COLORS = np.array(['gray', 'lightgreen', 'yellow', 'red'])
+LEVEL_COLORSCALE = [[0.0, 'gray'], [0.25, 'gray'], [0.25, 'lightgreen'], [0.5, 'lightgreen'],
+                    [0.5, 'yellow'], [0.75, 'yellow'], [0.75, 'red'], [1.0, 'red']]
 
-    def save_multiple_formats(self):
-        # Save interactive HTML
-        self.generate_interactive_plot()
+FORMATS = ('html', 'png', 'svg')
+OUTPUT_NAME = 'dependency_graph'
+TITLE = 'Code Dependency Map with Complexity Indicators'
 
-        # Save static PNG
-        plt.figure(figsize=(12, 8))
-        nx.draw(self.graph, with_labels=True, node_color='lightblue',
-                node_size=1500, arrowsize=20, font_size=10)
-        plt.savefig('dependency_graph.png')
 
-        # Save SVG for high-quality prints
-        plt.savefig('dependency_graph.svg', format='svg')
+def complexity_levels(complexity: np.ndarray) -> np.ndarray:
+    # 0 built-in, 1 low (<= 4), 2 medium (<= 8), 3 high complexity
+    return np.where(complexity < 0, 0, 1 + (complexity > 4) + (complexity > 8))
 
 
-    def create_visualization(self, dependency_data):
-        self.dependency_data = dependency_data  # Store the data as class attribute
-        self.build_graph(dependency_data)
-        self.save_multiple_formats()
+@dataclass
+class GraphRender:
+    """Everything a renderer needs; small enough to pickle to a worker."""
+    nodes: List[str]
+    edges: np.ndarray
+    positions: np.ndarray
+    complexity: np.ndarray
+    modules: List[str]
 
-    def build_graph(self, dependency_data):
-        for func, deps in dependency_data.items():
-            self.graph.add_node(func)
-            for callee in deps.callees:
-                self.graph.add_edge(func, callee)
+    def levels(self) -> np.ndarray:
+        return complexity_levels(self.complexity)
+
+    def edge_coordinates(self):
+        # One (start, end, NaN) triple per edge breaks the line between edges
+        segments = np.full((len(self.edges), 3, 2), np.nan)
+        segments[:, 0] = self.positions[self.edges[:, 0]]
+        segments[:, 1] = self.positions[self.edges[:, 1]]
+        return segments[:, :, 0].ravel(), segments[:, :, 1].ravel()
 
-    def create_edge_traces(self, pos):
-        edge_x = []
-        edge_y = []
-        for edge in self.graph.edges():
-            x0, y0 = pos[edge[0]]
-            x1, y1 = pos[edge[1]]
-            edge_x.extend([x0, x1, None])
-            edge_y.extend([y0, y1, None])
-        return edge_x, edge_y
-
-    def create_node_traces(self, pos):
-        node_x = []
-        node_y = []
-        for node in self.graph.nodes():
-            x, y = pos[node]
-            node_x.append(x)
-            node_y.append(y)
-        return node_x, node_y
-
-
-    def generate_interactive_plot(self):
-        pos = nx.spring_layout(self.graph)
-        node_colors = self.calculate_node_colors(self.dependency_data)
-
-        edge_x, edge_y = self.create_edge_traces(pos)
-        node_x, node_y = self.create_node_traces(pos)
+    def node_sizes(self, base: float) -> np.ndarray:
+        # Functions with more callers are drawn larger
+        callers = np.bincount(self.edges[:, 1], minlength=len(self.nodes))
+        return base * (1 + np.log1p(callers) / 2)
 
+
+def render_html(render: GraphRender, path: str):
+    import plotly.graph_objects as go
+    # WebGL keeps thousands of points interactive; labels move to hover
+    webgl = len(render.nodes) > WEBGL_THRESHOLD
+    scatter = go.Scattergl if webgl else go.Scatter
+    with PROFILER.stage('traces'):
+        edge_x, edge_y = render.edge_coordinates()
+        levels = render.levels()
+        sizes = render.node_sizes(6 if webgl else 20)
+        hover = np.empty((len(render.nodes), 2), dtype=object)
+        hover[:, 0] = np.where(render.complexity < 0, 'n/a', render.complexity.astype(str))
+        hover[:, 1] = render.modules
+
+    with PROFILER.stage('plotly_html'):
         fig = go.Figure(
             data=[
-                go.Scatter(x=edge_x, y=edge_y,
-                          line=dict(width=0.5, color='#888'),
-                          hoverinfo='none',
+                scatter(x=edge_x, y=edge_y,
+                        line=dict(width=0.5, color='#888'),
+                        hoverinfo='none',
                         mode='lines'),
-                go.Scatter(x=node_x, y=node_y,
-                          mode='markers+text',
-                          marker=dict(color=node_colors, size=20),
-                        text=list(self.graph.nodes()),
+                scatter(x=render.positions[:, 0], y=render.positions[:, 1],
+                        mode='markers' if webgl else 'markers+text',
+                        marker=dict(color=levels, colorscale=LEVEL_COLORSCALE,
+                                    cmin=0, cmax=3, size=sizes),
+                        text=render.nodes,
+                        customdata=hover,
+                        hovertemplate='%{text}<br>complexity: %{customdata[0]}'
+                                      '<br>module: %{customdata[1]}<extra></extra>',
                         textposition='bottom center')
             ],
             layout=go.Layout(
-                title='Code Dependency Map with Complexity Indicators',
+                title=TITLE,
                 showlegend=False,
                 hovermode='closest',
                 margin=dict(b=20, l=5, r=5, t=40)
             )
         )
+        fig.write_html(path)
+
+
+def render_static(render: GraphRender, outputs: List[Tuple[str, str]]):
+    """Draw the graph once and save it to every (path, format) in outputs."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    with PROFILER.stage('matplotlib_render'):
+        graph = nx.DiGraph()
+        graph.add_nodes_from(render.nodes)
+        graph.add_edges_from((render.nodes[s], render.nodes[t]) for s, t in render.edges)
+        pos = dict(zip(render.nodes, render.positions))
+
+        labels = len(render.nodes) <= LABEL_LIMIT
+        arrows = len(render.edges) <= ARROW_LIMIT
+        edge_style = dict(arrowsize=20) if arrows else dict(arrows=False, width=0.2)
+        plt.figure(figsize=(12, 8))
+        nx.draw(graph, pos=pos, with_labels=labels, node_color=LEVEL_COLORS[render.levels()],
+                node_size=1500 if labels else 10, font_size=10, **edge_style)
+        for path, image_format in outputs:
+            plt.savefig(path, format=image_format)
+        plt.close()
+
+
+def render_outputs(render: GraphRender, outputs: List[Tuple[str, str]]):
+    static = [(path, image_format) for path, image_format in outputs if image_format != 'html']
+    for path, image_format in outputs:
+        if image_format == 'html':
+            render_html(render, path)
+    if static:
+        render_static(render, static)
+
+
+def render_in_worker(render: GraphRender, outputs: List[Tuple[str, str]], profile: bool):
+    """render_outputs in a worker process, returning the origin and stages
+    its profiler recorded so the parent can merge them."""
+    if profile:
+        PROFILER.enable()
+    render_outputs(render, outputs)
+    return PROFILER.origin, PROFILER.events if profile else []
+
+
+class DependencyVisualizer:
+    def __init__(self, layout: str = 'auto', collapse_modules: bool = False,
+                 cache: AnalysisCache = None):
+        # layout is 'auto', 'spring' or 'hierarchical'; collapse_modules draws
+        # one node per module instead of one per function
+        self.graph = nx.DiGraph()
+        self.layout = layout
+        self.collapse_modules = collapse_modules
+        self.cache = cache
+        self.cluster_complexity = {}
+        # Array view of the graph: node i is nodes[i], edges is an (m, 2)
+        # array of node indices, complexity holds -1 for built-ins
+        self.nodes = []
+        self.edges = np.empty((0, 2), dtype=np.int64)
+        self.complexity = np.empty(0, dtype=np.int64)
+        self.modules = []
+
+    def calculate_node_colors(self, dependency_data=None):
+        return LEVEL_COLORS[self.complexity_levels()]
+
+    def complexity_levels(self) -> np.ndarray:
+        return complexity_levels(self.complexity)
+
+    def _complexity(self, deps) -> int:
+        return len(deps.callees) + len(deps.variables_used)
+
+    def save_multiple_formats(self):
+        return self.export(FORMATS, '.')
+
+    def export(self, formats: Iterable[str] = FORMATS, output_dir: str = '.') -> Dict[str, str]:
+        """Write the requested formats to output_dir and return their paths.
+
+        The layout is computed once and shared. With more than one format
+        and more than one CPU each format is rendered in its own worker
+        process, so Matplotlib drawing and Plotly serialization run at the
+        same time; otherwise they are rendered in turn, with PNG and SVG
+        saved from a single drawing. Either way the renderers' profiler
+        stages end up in PROFILER.
+        """
+        formats = list(dict.fromkeys(formats))
+        unknown = set(formats) - set(FORMATS)
+        if unknown:
+            raise ValueError(f"Unknown output formats: {', '.join(sorted(unknown))}")
+        if not formats:
+            return {}
+        os.makedirs(output_dir, exist_ok=True)
+        render = self.render_spec(self.compute_layout())
+        paths = {image_format: os.path.join(output_dir, f"{OUTPUT_NAME}.{image_format}")
+                 for image_format in formats}
+
+        outputs = [(paths[image_format], image_format) for image_format in formats]
+        workers = min(len(outputs), os.cpu_count() or 1)
+        with PROFILER.stage('export'):
+            if workers <= 1:
+                render_outputs(render, outputs)
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    futures = [pool.submit(render_in_worker, render, [output], PROFILER.enabled)
+                               for output in outputs]
+                    for future in futures:
+                        PROFILER.merge(*future.result())
+        return paths
+
+    def create_visualization(self, dependency_data, formats: Iterable[str] = FORMATS,
+                             output_dir: str = '.') -> Dict[str, str]:
+        self.dependency_data = dependency_data  # Store the data as class attribute
+        with PROFILER.stage('build_graph'):
+            self.build_graph(dependency_data)
+            if self.collapse_modules:
+                self.collapse_graph(dependency_data)
+            self.index_graph(dependency_data)
+        return self.export(formats, output_dir)
+
+    def build_graph(self, dependency_data):
+        for func, deps in dependency_data.items():
+            self.graph.add_node(func)
+            for callee in deps.callees:
+                self.graph.add_edge(func, callee)
+
+    def collapse_graph(self, dependency_data):
+        """Replace the function graph by one node per module."""
+        clusters = module_clusters(self.graph, dependency_data, project_root(dependency_data))
+        complexity = {}
+        for node, cluster in clusters.items():
+            if node in dependency_data:
+                complexity[cluster] = max(complexity.get(cluster, 0),
+                                          self._complexity(dependency_data[node]))
+        self.graph = collapse_clusters(self.graph, clusters)
+        self.cluster_complexity = complexity
+
+    def index_graph(self, dependency_data):
+        """Build the array view of self.graph used for layout and traces."""
+        self.nodes = list(self.graph.nodes())
+        index = {node: i for i, node in enumerate(self.nodes)}
+        self.edges = np.array([(index[source], index[target])
+                               for source, target in self.graph.edges()],
+                              dtype=np.int64).reshape(-1, 2)
+        if self.collapse_modules:
+            self.modules = list(self.nodes)
+            self.complexity = np.array([self.cluster_complexity.get(node, -1)
+                                        for node in self.nodes], dtype=np.int64)
+        else:
+            clusters = module_clusters(self.graph, dependency_data, project_root(dependency_data))
+            self.modules = [clusters[node] for node in self.nodes]
+            self.complexity = np.array([self._complexity(dependency_data[node])
+                                        if node in dependency_data else -1
+                                        for node in self.nodes], dtype=np.int64)
+
+    def render_spec(self, positions: np.ndarray) -> GraphRender:
+        return GraphRender(self.nodes, self.edges, positions, self.complexity, self.modules)
+
+    def compute_layout(self) -> np.ndarray:
+        """(n, 2) node positions, reused from the cache while the graph is unchanged."""
+        algorithm = self.layout
+        if algorithm == 'auto':
+            algorithm = 'spring' if len(self.graph) <= SPRING_LAYOUT_LIMIT else 'hierarchical'
+        kind = f"graph_layout:{algorithm}"
+        key = graph_digest(self.graph) if self.cache is not None else None
+        if self.cache is not None:
+            cached = self.cache.get(kind, key)
+            if cached is not None:
+                return np.array(cached['positions'], dtype=np.float64).reshape(-1, 2)
+
+        with PROFILER.stage('layout'):
+            if algorithm == 'spring':
+                pos = nx.spring_layout(self.graph)
+            else:
+                pos = hierarchical_layout(self.graph)
+            positions = np.array([pos[node] for node in self.nodes], dtype=np.float64).reshape(-1, 2)
+        if self.cache is not None:
+            self.cache.put(kind, key, {'positions': positions.round(6).tolist()})
+        return positions
 
-        fig.write_html("dependency_graph.html")
+    def create_edge_traces(self, positions: np.ndarray):
+        return self.render_spec(positions).edge_coordinates()
 
+    def create_node_traces(self, positions: np.ndarray):
+        return positions[:, 0], positions[:, 1]
 
+    def generate_interactive_plot(self, positions=None, path: str = f"{OUTPUT_NAME}.html"):
+        if positions is None:
+            positions = self.compute_layout()
+        render_html(self.render_spec(positions), path)
@@ -1,44 +1,109 @@
-from typing import List, Dict, Any
+from typing import AsyncIterator, List, Dict, Any, Optional
+from concurrent.futures import ProcessPoolExecutor
 from data_processor import DataProcessor
+from batch_scheduler import BatchScheduler, InvalidBatchError, Source, iterate_batches
+from stream_sources import DEFAULT_CHUNK_SIZE, open_source, validate_chunk
 import asyncio
 from datetime import datetime
 import json
 
+# Points the processor keeps; statistics still cover every point
+DEFAULT_MAX_POINTS = 1_000_000
+
 class AnalysisEngine:
-    def __init__(self, batch_size: int = 100):
-        self.processor = DataProcessor(threshold=15.0)
+    def __init__(self, batch_size: int = 100, concurrency: int = 4, queue_size: int = 8,
+                 process_workers: int = 0, max_points: Optional[int] = DEFAULT_MAX_POINTS):
+        # Up to `concurrency` batches are in flight and `queue_size` wait
+        # behind them; process_workers > 0 transforms batches in a process pool
+        self.processor = DataProcessor(threshold=15.0, max_points=max_points)
         self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.process_workers = process_workers
         self.analysis_history: List[Dict[str, Any]] = []
 
-    async def run_analysis(self, dataset: List[float]) -> Dict[str, Any]:
-        if not self._validate_input(dataset):
-            return {"error": "Invalid input data format"}
+    async def run_analysis(self, dataset: Source) -> Dict[str, Any]:
+        """Analyze a list, or an iterator / async iterator of numbers.
 
-        batches = [dataset[i:i + self.batch_size]
-                   for i in range(0, len(dataset), self.batch_size)]
+        Lists are validated before any batch runs; iterators are validated
+        batch by batch as they are read, so an invalid value stops the run
+        after the batches before it.
+        """
+        materialized = hasattr(dataset, '__len__')
+        if materialized and not self._validate_input(dataset):
+            return {"error": "Invalid input data format"}
 
-        results = []
-        for batch in batches:
-            batch_result = await self.processor.process_batch(batch)
-            results.append(batch_result)
+        batches = iterate_batches(dataset, self.batch_size)
+        validate = None if materialized else self._validate_input
+        try:
+            results = [result async for result in self._schedule(batches, validate=validate)]
+        except InvalidBatchError:
+            return {"error": "Invalid input data format"}
 
         analysis_result = self._compile_results(results)
+        self._record_history(analysis_result)
+        return analysis_result
+
+    async def stream_analysis(self, source, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                              **file_options) -> AsyncIterator[Dict[str, Any]]:
+        """Analyze a file or a (async) stream chunk by chunk, yielding each result.
+
+        `source` is a path (.csv/.txt files are parsed as CSV, anything else
+        is memory-mapped as raw float64 unless `dtype` is given), or an
+        iterable / async iterable of numbers or arrays. Each chunk is
+        validated on its own; an invalid chunk yields an error result and
+        is skipped. Chunk results carry the transformed values as an array:
+        {"chunk": i, "status": "success", "results": ndarray}. Memory stays
+        bounded by the scheduler's queues and the processor's max_points.
+        """
+        chunks = open_source(source, chunk_size, **file_options)
+        index = 0
+        async for result in self._schedule(chunks, validate=validate_chunk, report_invalid=True):
+            yield {"chunk": index, **result}
+            index += 1
+
+    async def analyze_stream(self, source, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                             **file_options) -> Dict[str, Any]:
+        """Run stream_analysis to the end and compile its summary."""
+        total_processed = 0
+        failed_chunks = 0
+        async for result in self.stream_analysis(source, chunk_size, **file_options):
+            if result["status"] == "success":
+                total_processed += len(result["results"])
+            else:
+                failed_chunks += 1
+        analysis_result = self._summary(total_processed)
+        analysis_result["failed_chunks"] = failed_chunks
+        self._record_history(analysis_result)
+        return analysis_result
+
+    async def _schedule(self, batches, **options) -> AsyncIterator[Dict]:
+        if self.process_workers <= 0:
+            scheduler = BatchScheduler(self.processor, self.concurrency, self.queue_size, **options)
+            async for result in scheduler.stream(batches):
+                yield result
+            return
+        with ProcessPoolExecutor(max_workers=self.process_workers) as pool:
+            scheduler = BatchScheduler(self.processor, self.concurrency, self.queue_size,
+                                       executor=pool, **options)
+            async for result in scheduler.stream(batches):
+                yield result
+
+    def _record_history(self, analysis_result: Dict[str, Any]):
         self.analysis_history.append({
             "timestamp": datetime.now().isoformat(),
             "result": analysis_result
         })
 
-        return analysis_result
-
     def _validate_input(self, dataset: List[float]) -> bool:
         return all(isinstance(x, (int, float)) for x in dataset)
 
     def _compile_results(self, results: List[Dict]) -> Dict[str, Any]:
-        successful_results = [r["results"] for r in results if r["status"] == "success"]
-        flattened_results = [item for sublist in successful_results for item in sublist]
+        return self._summary(sum(len(r["results"]) for r in results if r["status"] == "success"))
 
+    def _summary(self, total_processed: int) -> Dict[str, Any]:
         return {
-            "total_processed": len(flattened_results),
+            "total_processed": total_processed,
             "statistics": self.processor.get_statistics(),
             "timestamp": datetime.now().isoformat()
         }
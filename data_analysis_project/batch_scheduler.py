@@ -0,0 +1,166 @@
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Dict, Iterable, List, Optional, Union
+from concurrent.futures import Executor
+import asyncio
+from data_processor import DataProcessor, transform_batch
+
+Source = Union[Iterable[float], AsyncIterable[float]]
+
+class InvalidBatchError(ValueError):
+    pass
+
+async def iterate_values(source: Source) -> AsyncIterator[Any]:
+    if hasattr(source, '__aiter__'):
+        async for value in source:
+            yield value
+    else:
+        for value in source:
+            yield value
+
+async def iterate_batches(source: Source, batch_size: int) -> AsyncIterator[Any]:
+    """Split a list, array, iterator or async iterator into batches.
+
+    Sequences are sliced, so lists give the same batches as before; anything
+    else is read one value at a time and never materialized as a whole.
+    """
+    if hasattr(source, '__getitem__') and hasattr(source, '__len__'):
+        for i in range(0, len(source), batch_size):
+            yield source[i:i + batch_size]
+        return
+    batch = []
+    async for value in iterate_values(source):
+        batch.append(value)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+class BatchScheduler:
+    """Runs batches through a DataProcessor concurrently.
+
+    A producer reads batches into a queue of at most `queue_size` entries,
+    so a fast source waits for the workers instead of filling memory. Up to
+    `concurrency` workers transform batches, but never more than
+    `queue_size` ahead of the next batch to be recorded, so one slow batch
+    holds the rest back instead of letting finished ones pile up. Batches
+    are transformed in `executor` when given (a process pool for CPU-bound
+    work) and in asyncio's default thread pool otherwise, where NumPy
+    releases the GIL and the event loop stays free. Transformed batches are recorded in the
+    processor strictly in input order, so results and statistics are the
+    same as processing them one by one.
+
+    A batch rejected by `validate` raises InvalidBatchError, or with
+    report_invalid=True becomes an error result and is skipped.
+    """
+
+    def __init__(self, processor: DataProcessor, concurrency: int = 4, queue_size: int = 8,
+                 executor: Optional[Executor] = None,
+                 validate: Optional[Callable[[Any], bool]] = None,
+                 report_invalid: bool = False):
+        self.processor = processor
+        self.concurrency = max(1, concurrency)
+        self.queue_size = max(1, queue_size)
+        self.executor = executor
+        self.validate = validate
+        self.report_invalid = report_invalid
+
+    async def run(self, batches: AsyncIterable[Any]) -> List[Dict]:
+        """Process every batch and return the per-batch results in input order."""
+        return [result async for result in self.stream(batches)]
+
+    async def stream(self, batches: AsyncIterable[Any]) -> AsyncIterator[Dict]:
+        """Yield per-batch results in input order as soon as they are recorded.
+
+        Results are {"status": "success", "results": ndarray} or
+        {"status": "error", "message": ...}. The output queue is bounded
+        too, so a slow consumer holds back the workers and the source.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        output: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        completed: Dict[int, Dict] = {}
+        record_lock = asyncio.Lock()
+        # Notified whenever `recorded` advances
+        window = asyncio.Condition()
+        recorded = 0
+        finished = object()
+
+        async def produce():
+            index = 0
+            async for batch in batches:
+                valid = self.validate is None or self.validate(batch)
+                if not valid and not self.report_invalid:
+                    raise InvalidBatchError(f"Invalid input data format in batch {index}")
+                await queue.put((index, batch, valid))
+                index += 1
+            for _ in range(self.concurrency):
+                await queue.put(None)
+
+        async def work():
+            nonlocal recorded
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                index, batch, valid = item
+                async with window:
+                    await window.wait_for(lambda: index - recorded < self.queue_size)
+                completed[index] = await self._transform(batch) if valid else {"invalid": True}
+                # Record every batch that is next in line
+                async with record_lock:
+                    while recorded in completed:
+                        outcome = completed.pop(recorded)
+                        recorded += 1
+                        async with window:
+                            window.notify_all()
+                        await output.put(self._record(outcome))
+
+        async def supervise():
+            tasks = [asyncio.create_task(produce())]
+            tasks += [asyncio.create_task(work()) for _ in range(self.concurrency)]
+            try:
+                await asyncio.gather(*tasks)
+            except BaseException as e:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                if isinstance(e, asyncio.CancelledError):
+                    raise
+                await output.put(e)
+                return
+            await output.put(finished)
+
+        supervisor = asyncio.create_task(supervise())
+        try:
+            while True:
+                result = await output.get()
+                if result is finished:
+                    break
+                if isinstance(result, BaseException):
+                    raise result
+                yield result
+        finally:
+            supervisor.cancel()
+            await asyncio.gather(supervisor, return_exceptions=True)
+
+    async def _transform(self, batch) -> Dict:
+        try:
+            if self.executor is None:
+                transformed = await asyncio.to_thread(transform_batch, batch,
+                                                      self.processor.threshold)
+            else:
+                loop = asyncio.get_running_loop()
+                transformed = await loop.run_in_executor(self.executor, transform_batch,
+                                                         batch, self.processor.threshold)
+            return {"transformed": transformed}
+        except Exception as e:
+            return {"error": e}
+
+    def _record(self, outcome: Dict) -> Dict:
+        if "invalid" in outcome:
+            return {"status": "error", "message": "Invalid input data format"}
+        if "error" in outcome:
+            self.processor.logger.error(f"Processing error: {str(outcome['error'])}")
+            return {"status": "error", "message": str(outcome["error"])}
+        values, processed, results = outcome["transformed"]
+        self.processor.record_batch(values, processed)
+        return {"status": "success", "results": results}
@@ -1,31 +1,181 @@
-from typing import List, Dict, Union, Optional
+from typing import Iterator, List, Dict, Union, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 import asyncio
 import logging
+import time
+import numpy as np
+from running_stats import StatisticsTracker
 
-@dataclass
+# Store capacity grows in multiples of this many points
+STORE_CHUNK = 65536
+
+@dataclass(slots=True)
 class DataPoint:
     value: float
     timestamp: datetime
     processed: bool = False
 
+class PointStore:
+    """Columnar storage for processed points: 17 bytes per point.
+
+    Values (float64), timestamps (int64 ns since the epoch) and processed
+    flags live in contiguous arrays that grow in chunks of `chunk_size`.
+    Retention keeps at most `max_points` points and/or only those newer
+    than `max_age` seconds; older points are dropped from the front as new
+    ones arrive. Indexing and iteration give DataPoint views.
+    """
+
+    def __init__(self, max_points: Optional[int] = None, max_age: Optional[float] = None,
+                 chunk_size: int = STORE_CHUNK):
+        self.max_points = max_points
+        self.max_age = max_age
+        self.chunk_size = max(1, chunk_size)
+        self._values = np.empty(0, dtype=np.float64)
+        self._timestamps = np.empty(0, dtype=np.int64)
+        self._processed = np.empty(0, dtype=bool)
+        # Live points are [_start, _end) of the arrays
+        self._start = 0
+        self._end = 0
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def __getitem__(self, index: int) -> DataPoint:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("point index out of range")
+        i = self._start + index
+        return DataPoint(float(self._values[i]),
+                         datetime.fromtimestamp(int(self._timestamps[i]) / 1e9),
+                         bool(self._processed[i]))
+
+    def __iter__(self) -> Iterator[DataPoint]:
+        return (self[i] for i in range(len(self)))
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._values[self._start:self._end]
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self._timestamps[self._start:self._end]
+
+    @property
+    def processed(self) -> np.ndarray:
+        return self._processed[self._start:self._end]
+
+    @property
+    def nbytes(self) -> int:
+        return self._values.nbytes + self._timestamps.nbytes + self._processed.nbytes
+
+    def append(self, values: np.ndarray, processed: np.ndarray, timestamp: Optional[int] = None):
+        """Add a batch; timestamp is ns since the epoch, shared or one per point."""
+        now = time.time_ns()
+        count = len(values)
+        self._reserve(count)
+        end = self._end + count
+        self._values[self._end:end] = values
+        self._timestamps[self._end:end] = now if timestamp is None else timestamp
+        self._processed[self._end:end] = processed
+        self._end = end
+        self._apply_retention(now)
+
+    def _reserve(self, count: int):
+        if self._end + count <= len(self._values):
+            return
+        live = len(self)
+        needed = live + count
+        capacity = len(self._values)
+        if needed > capacity:
+            # Grow by half again, rounded up to whole chunks
+            capacity = max(needed, capacity + capacity // 2)
+            capacity = -(-capacity // self.chunk_size) * self.chunk_size
+        for name in ('_values', '_timestamps', '_processed'):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype) if capacity != len(old) else old
+            new[:live] = old[self._start:self._end]
+            setattr(self, name, new)
+        self._start, self._end = 0, live
+
+    def _apply_retention(self, now: int):
+        if self.max_points is not None:
+            self._start = max(self._start, self._end - self.max_points)
+        if self.max_age is not None:
+            cutoff = now - int(self.max_age * 1e9)
+            self._start += int(np.searchsorted(self.timestamps, cutoff, side='left'))
+
+def transform_values(values: np.ndarray, threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Threshold filter and transform for a whole batch: (processed mask, results)."""
+    processed = values > threshold
+    return processed, values[processed] * 2
+
+def result_list(numbers, processed: np.ndarray, results: np.ndarray) -> list:
+    """Transformed values as the per-point path returns them.
+
+    Each passing element of a list or array.array is doubled as the Python
+    number it is, so ints stay ints beside floats instead of sharing the
+    batch's NumPy dtype; an ndarray batch comes back through tolist().
+    """
+    if isinstance(numbers, np.ndarray):
+        return results.tolist()
+    return [numbers[i] * 2 for i in np.flatnonzero(processed).tolist()]
+
+def transform_batch(numbers, threshold: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(values, processed mask, results) for one batch; a pure function, so
+    it can run in a worker process."""
+    values = np.asarray(numbers)
+    processed, results = transform_values(values, threshold)
+    return values, processed, results
+
 class DataProcessor:
-    def __init__(self, threshold: float = 10.0):
+    def __init__(self, threshold: float = 10.0, vectorized: bool = True,
+                 max_points: Optional[int] = None, max_age: Optional[float] = None,
+                 sketch: bool = False):
+        # vectorized=False keeps the original one-coroutine-per-point path;
+        # max_points and max_age (seconds) bound what data_points retains,
+        # while statistics keep covering every point processed; sketch adds
+        # approximate quantiles to the detailed statistics
         self.threshold = threshold
-        self.data_points: List[DataPoint] = []
+        self.vectorized = vectorized
+        self.data_points = PointStore(max_points=max_points, max_age=max_age)
+        self.statistics = StatisticsTracker(sketch=sketch)
         self.logger = logging.getLogger(__name__)
 
     async def process_batch(self, numbers: List[float]) -> Dict[str, Union[List[float], str]]:
         try:
-            data_points = [DataPoint(value=n, timestamp=datetime.now()) for n in numbers]
-            self.data_points.extend(data_points)
-            processed = await self._transform_data(data_points)
+            if self.vectorized:
+                values, mask, results = transform_batch(numbers, self.threshold)
+                self.record_batch(values, mask)
+                processed = result_list(numbers, mask, results)
+            else:
+                data_points = [DataPoint(value=n, timestamp=datetime.now()) for n in numbers]
+                processed = await self._transform_data(data_points)
+                self.record_batch(np.array([p.value for p in data_points], dtype=np.float64),
+                                  np.array([p.processed for p in data_points], dtype=bool))
             return {"status": "success", "results": processed}
         except Exception as e:
             self.logger.error(f"Processing error: {str(e)}")
             return {"status": "error", "message": str(e)}
 
+    def process_values(self, numbers) -> np.ndarray:
+        """Synchronous batch engine behind process_batch.
+
+        Accepts a list, array.array or NumPy array and returns the
+        transformed values that passed the threshold, in input order. The
+        whole batch shares one timestamp.
+        """
+        values, processed, results = transform_batch(numbers, self.threshold)
+        self.record_batch(values, processed)
+        return results
+
+    def record_batch(self, values: np.ndarray, processed: np.ndarray):
+        """Store a transformed batch and fold it into the statistics."""
+        timestamp = time.time_ns()
+        self.data_points.append(values, processed, timestamp)
+        self.statistics.update(values, processed, timestamp)
+
     async def _transform_data(self, points: List[DataPoint]) -> List[float]:
         tasks = [self._process_point(point) for point in points]
         results = await asyncio.gather(*tasks)
@@ -37,10 +187,11 @@ class DataProcessor:
             return point.value * 2
         return None
 
-    def get_statistics(self) -> Dict[str, Union[int, float]]:
-        processed_points = [p for p in self.data_points if p.processed]
-        return {
-            "total_points": len(self.data_points),
-            "processed_points": len(processed_points),
-            "average_value": sum(p.value for p in processed_points) / len(processed_points) if processed_points else 0
-        }
+    def get_statistics(self, window: Optional[float] = None,
+                       detailed: bool = False) -> Dict[str, Union[int, float]]:
+        """Constant-time statistics, over all points or the last `window` seconds.
+
+        detailed adds variance, min and max of the processed values, and
+        quantiles when the processor was created with sketch=True.
+        """
+        return self.statistics.snapshot(window=window, detailed=detailed)
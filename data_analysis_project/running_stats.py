@@ -0,0 +1,188 @@
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+import math
+import time
+import numpy as np
+
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+
+@dataclass
+class RunningStats:
+    """Mergeable aggregates of a stream of batches.
+
+    `total` counts every point seen; the remaining fields describe the
+    processed values only. Mean and variance use Chan's parallel update, so
+    a batch is folded in with one pass over its values.
+    """
+    total: int = 0
+    count: int = 0
+    value_sum: float = 0.0
+    mean: float = 0.0
+    m2: float = 0.0
+    minimum: float = math.inf
+    maximum: float = -math.inf
+
+    def update(self, values: np.ndarray, processed: np.ndarray):
+        batch = values[processed]
+        batch_stats = RunningStats(total=len(values))
+        if len(batch):
+            batch_mean = float(batch.mean())
+            batch_stats = RunningStats(len(values), len(batch), float(batch.sum()), batch_mean,
+                                       float(((batch - batch_mean) ** 2).sum()),
+                                       float(batch.min()), float(batch.max()))
+        self.merge(batch_stats)
+
+    def merge(self, other: 'RunningStats'):
+        self.total += other.total
+        if other.count == 0:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.value_sum += other.value_sum
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / self.count if self.count else 0.0
+
+class QuantileSketch:
+    """Log-bucketed quantile sketch with bounded relative error (DDSketch).
+
+    A value v > 0 falls into bucket ceil(log(v) / log(gamma)); every
+    quantile is answered within `relative_accuracy` of the true value, and
+    the number of buckets only grows with the logarithm of the value range.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive: Counter = Counter()
+        self.negative: Counter = Counter()
+        self.zeros = 0
+        self.count = 0
+
+    def update(self, values: np.ndarray):
+        self._add(self.positive, values[values > 0])
+        self._add(self.negative, -values[values < 0])
+        self.zeros += int(np.count_nonzero(values == 0))
+        self.count += len(values)
+
+    def _add(self, buckets: Counter, magnitudes: np.ndarray):
+        if len(magnitudes):
+            keys, counts = np.unique(np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64),
+                                     return_counts=True)
+            buckets.update(dict(zip(keys.tolist(), counts.tolist())))
+
+    def merge(self, other: 'QuantileSketch'):
+        self.positive.update(other.positive)
+        self.negative.update(other.negative)
+        self.zeros += other.zeros
+        self.count += other.count
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        # Walk from the most negative value up to the largest positive one
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._value(key)
+        seen += self.zeros
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(max(self.positive))
+
+    def _value(self, key: int) -> float:
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+@dataclass
+class StatsBucket:
+    start: int
+    stats: RunningStats = field(default_factory=RunningStats)
+    sketch: Optional[QuantileSketch] = None
+
+class StatisticsTracker:
+    """Running statistics over all batches and over recent time windows.
+
+    Lifetime aggregates are updated once per batch. Windowed queries merge
+    per-`bucket_seconds` aggregates kept for the last `horizon` seconds, so
+    their cost depends on the window length, never on the number of
+    points; windows are resolved to whole buckets.
+    """
+
+    def __init__(self, sketch: bool = False, bucket_seconds: float = 1.0,
+                 horizon: float = 3600.0, relative_accuracy: float = 0.01):
+        self.sketch = sketch
+        self.relative_accuracy = relative_accuracy
+        self.bucket_ns = max(1, int(bucket_seconds * 1e9))
+        self.horizon_ns = int(horizon * 1e9)
+        self.lifetime = StatsBucket(0, sketch=self._new_sketch())
+        self.buckets: deque = deque()
+
+    def _new_sketch(self) -> Optional[QuantileSketch]:
+        return QuantileSketch(self.relative_accuracy) if self.sketch else None
+
+    def update(self, values: np.ndarray, processed: np.ndarray, timestamp: Optional[int] = None):
+        """Fold in a batch recorded at `timestamp` (ns since the epoch)."""
+        timestamp = time.time_ns() if timestamp is None else timestamp
+        values = np.asarray(values, dtype=np.float64)
+        processed = np.asarray(processed, dtype=bool)
+        batch = StatsBucket(timestamp - timestamp % self.bucket_ns, sketch=self._new_sketch())
+        batch.stats.update(values, processed)
+        if batch.sketch is not None:
+            batch.sketch.update(values[processed])
+
+        self._merge(self.lifetime, batch)
+        if self.buckets and self.buckets[-1].start >= batch.start:
+            self._merge(self.buckets[-1], batch)
+        else:
+            self.buckets.append(batch)
+        while self.buckets and self.buckets[0].start < timestamp - self.horizon_ns:
+            self.buckets.popleft()
+
+    def _merge(self, target: StatsBucket, batch: StatsBucket):
+        target.stats.merge(batch.stats)
+        if target.sketch is not None:
+            target.sketch.merge(batch.sketch)
+
+    def window(self, seconds: float, now: Optional[int] = None) -> StatsBucket:
+        """Aggregates of the buckets that started within the last `seconds`."""
+        now = time.time_ns() if now is None else now
+        cutoff = now - int(seconds * 1e9)
+        merged = StatsBucket(cutoff, sketch=self._new_sketch())
+        for bucket in reversed(self.buckets):
+            if bucket.start + self.bucket_ns <= cutoff:
+                break
+            self._merge(merged, bucket)
+        return merged
+
+    def snapshot(self, window: Optional[float] = None, detailed: bool = False,
+                 quantiles=DEFAULT_QUANTILES) -> Dict:
+        bucket = self.lifetime if window is None else self.window(window)
+        stats = bucket.stats
+        result = {
+            "total_points": stats.total,
+            "processed_points": stats.count,
+            "average_value": stats.value_sum / stats.count if stats.count else 0
+        }
+        if detailed:
+            result.update({
+                "variance": stats.variance,
+                "min_value": stats.minimum if stats.count else None,
+                "max_value": stats.maximum if stats.count else None
+            })
+            if bucket.sketch is not None:
+                result["quantiles"] = {f"p{q * 100:g}": bucket.sketch.quantile(q) for q in quantiles}
+        return result
@@ -0,0 +1,168 @@
+from typing import Any, AsyncIterator, Iterator, List, Optional, Tuple, Union
+import logging
+import mmap
+import os
+import numpy as np
+from batch_scheduler import Source, iterate_values
+
+logger = logging.getLogger(__name__)
+
+# Values per chunk for binary files and iterators, bytes per read for CSV;
+# file_chunks reads CSV_BYTES_PER_VALUE bytes of text per requested value
+DEFAULT_CHUNK_SIZE = 1 << 16
+CSV_BYTES_PER_VALUE = 16
+DEFAULT_CHUNK_BYTES = DEFAULT_CHUNK_SIZE * CSV_BYTES_PER_VALUE
+
+CSV_SUFFIXES = ('.csv', '.txt')
+
+def validate_chunk(chunk: Any) -> bool:
+    """Vectorized form of the per-value isinstance check: the chunk's dtype
+    must be boolean, integer or floating point."""
+    return np.asarray(chunk).dtype.kind in 'biuf'
+
+def binary_chunks(path: str, dtype=np.float64,
+                  chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[np.ndarray]:
+    """Chunks of a raw binary array file, read through a memory map.
+
+    Pages are handed back to the OS once their chunk has been copied out,
+    so resident memory stays flat however large the file is. A file that
+    ends in a partial value (a truncated write) raises ValueError naming
+    the file and the offset of the partial value, before any chunk.
+    """
+    size = os.path.getsize(path)
+    itemsize = np.dtype(dtype).itemsize
+    if size % itemsize:
+        whole = size - size % itemsize
+        raise ValueError(f"{path}: {size} bytes is not a whole number of {np.dtype(dtype)} "
+                         f"values; partial value of {size - whole} bytes at offset {whole}")
+    if size == 0:
+        return
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        data = np.frombuffer(mapped, dtype=dtype)
+        released = 0
+        try:
+            for start in range(0, len(data), chunk_size):
+                chunk = np.array(data[start:start + chunk_size])
+                done = (start + len(chunk)) * data.itemsize
+                done -= done % mmap.PAGESIZE
+                if hasattr(mapped, 'madvise') and done > released:
+                    mapped.madvise(mmap.MADV_DONTNEED, released, done - released)
+                    released = done
+                yield chunk
+        finally:
+            # The mapping cannot close while an array still exports it
+            del data
+
+def parse_csv_block(block: bytes, delimiter: str = ',') -> Tuple[np.ndarray, List[int]]:
+    """Floats in a block of whole CSV lines, and the indexes of the lines
+    left out because a field is empty or not a number.
+
+    The whole block is converted at once; only a block that fails is
+    parsed again line by line, so one bad row drops just that row. Blank
+    lines are skipped; a whitespace delimiter splits on runs of whitespace.
+    """
+    lines = block.split(b'\n')
+    try:
+        fields = _split_fields(b'\n'.join(line for line in lines if line.strip()), delimiter)
+        return np.array(fields).astype(np.float64), []
+    except ValueError:
+        pass
+    values, bad_lines = [], []
+    for index, line in enumerate(lines):
+        if not line.strip():
+            continue
+        try:
+            values.extend([float(field) for field in _split_fields(line, delimiter)])
+        except ValueError:
+            bad_lines.append(index)
+    return np.array(values, dtype=np.float64), bad_lines
+
+def _split_fields(lines: bytes, delimiter: str) -> List[bytes]:
+    # Lines are joined with the delimiter, so an empty field anywhere in a
+    # line is still an empty field, which float conversion rejects
+    if delimiter.isspace():
+        return lines.split()
+    separator = delimiter.encode()
+    return lines.replace(b'\n', separator).split(separator) if lines else []
+
+def csv_chunks(path: str, chunk_bytes: int = DEFAULT_CHUNK_BYTES, delimiter: str = ',',
+               skip_header: Optional[bool] = None) -> Iterator[np.ndarray]:
+    """Every number in a CSV file, about `chunk_bytes` at a time.
+
+    skip_header=None skips the first line only when it is not all numbers
+    and has no empty field. Other lines with a field that is empty or not a
+    number are left out and logged.
+    """
+    with open(path, 'rb') as f:
+        tail = f.readline()
+        if skip_header or (skip_header is None and _is_header(tail, delimiter)):
+            tail = b''
+        # 1-based number of the first line in tail
+        line = 1 if tail else 2
+        while True:
+            block = f.read(chunk_bytes)
+            if not block:
+                break
+            block = tail + block
+            # Only parse whole lines; the rest waits for the next read
+            cut = block.rfind(b'\n') + 1
+            tail = block[cut:]
+            if cut:
+                yield _parsed_lines(path, block[:cut], delimiter, line)
+                line += block.count(b'\n', 0, cut)
+        if tail.strip():
+            yield _parsed_lines(path, tail, delimiter, line)
+
+def _is_header(line: bytes, delimiter: str) -> bool:
+    # Names in every field; a line with an empty field is bad data instead
+    fields = _split_fields(line.strip(), delimiter)
+    return bool(parse_csv_block(line, delimiter)[1]) and all(field.strip() for field in fields)
+
+def _parsed_lines(path: str, block: bytes, delimiter: str, line: int) -> np.ndarray:
+    values, bad_lines = parse_csv_block(block, delimiter)
+    if bad_lines:
+        logger.warning(f"{path}: skipped {len(bad_lines)} line(s) with non-numeric fields, "
+                       f"first at line {line + bad_lines[0]}")
+    return values
+
+def file_chunks(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, dtype=np.float64,
+                **csv_options) -> Iterator[np.ndarray]:
+    """CSV chunks for .csv/.txt files, memory-mapped binary chunks otherwise.
+
+    CSV text is read `chunk_size * CSV_BYTES_PER_VALUE` bytes at a time
+    unless `chunk_bytes` is given, so chunks hold about `chunk_size` values.
+    """
+    if str(path).lower().endswith(CSV_SUFFIXES):
+        csv_options.setdefault('chunk_bytes', max(1, chunk_size * CSV_BYTES_PER_VALUE))
+        return csv_chunks(path, **csv_options)
+    return binary_chunks(path, dtype=dtype, chunk_size=chunk_size)
+
+async def rechunk(source: Source, chunk_size: int = DEFAULT_CHUNK_SIZE) -> AsyncIterator[np.ndarray]:
+    """Arrays of at most `chunk_size` values from a sync or async source.
+
+    The source may yield single values, which are gathered into chunks, or
+    array-likes, which are split into chunks.
+    """
+    pending = []
+    async for item in iterate_values(source):
+        if np.ndim(item) == 0:
+            pending.append(item)
+            if len(pending) == chunk_size:
+                yield np.asarray(pending)
+                pending = []
+            continue
+        if pending:
+            yield np.asarray(pending)
+            pending = []
+        item = np.asarray(item)
+        for start in range(0, len(item), chunk_size):
+            yield item[start:start + chunk_size]
+    if pending:
+        yield np.asarray(pending)
+
+def open_source(source: Union[str, os.PathLike, Source], chunk_size: int = DEFAULT_CHUNK_SIZE,
+                **file_options) -> AsyncIterator[np.ndarray]:
+    """Chunks from a file path, or from any iterable or async iterable."""
+    if isinstance(source, (str, os.PathLike)):
+        source = file_chunks(os.fspath(source), chunk_size=chunk_size, **file_options)
+    return rechunk(source, chunk_size)
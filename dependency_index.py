@@ -0,0 +1,77 @@
+import json
+import os
+from typing import Dict
+
+from call_graph import CallGraph, CallResolver
+from file_analysis import FileAnalysis
+
+DEFAULT_INDEX_PATH = ".dependency_index.json"
+INDEX_VERSION = 2
+
+
+class DependencyIndex:
+    """Saved call graph used by the pre-commit hook.
+
+    For every file it keeps just what impact analysis needs: the module name,
+    its imports, and each function's qualified name, source digest and the
+    bare names it calls. Loading this is far cheaper than re-parsing the
+    tree, so a commit only parses the files it touches.
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH):
+        self.path = path
+        self.files: Dict[str, Dict] = {}
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_INDEX_PATH) -> 'DependencyIndex':
+        index = cls(path)
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                data = json.load(f)
+            if data.get('version') == INDEX_VERSION:
+                index.files = data['files']
+        return index
+
+    def save(self):
+        with open(self.path, 'w') as f:
+            json.dump({'version': INDEX_VERSION, 'files': self.files}, f)
+
+    def update(self, analysis: FileAnalysis, module: str):
+        self.files[analysis.file_path] = {
+            'module': module,
+            'imports': analysis.imports,
+            'functions': [[record.qualname, record.digest, sorted(record.callees)]
+                          for record in analysis.functions]
+        }
+
+    def remove(self, file_path: str):
+        self.files.pop(file_path, None)
+
+    def digests(self, file_path: str) -> Dict[str, str]:
+        entry = self.files.get(file_path)
+        if entry is None:
+            return {}
+        return {f"{entry['module']}.{qualname}": digest
+                for qualname, digest, _ in entry['functions']}
+
+    def function_files(self) -> Dict[str, str]:
+        return {f"{entry['module']}.{qualname}": file_path
+                for file_path, entry in self.files.items()
+                for qualname, _, _ in entry['functions']}
+
+    def call_graph(self) -> CallGraph:
+        resolver = CallResolver()
+        for entry in self.files.values():
+            resolver.add_module(entry['module'], entry['imports'],
+                                [qualname for qualname, _, _ in entry['functions']])
+
+        nodes = []
+        edges = []
+        for entry in self.files.values():
+            module = entry['module']
+            for qualname, _, callees in entry['functions']:
+                caller = f"{module}.{qualname}"
+                nodes.append(caller)
+                for callee in callees:
+                    edges.append((caller, resolver.resolve(module, qualname, callee)))
+        return CallGraph.build(nodes, edges)
@@ -1,3 +1,8 @@
+from typing import Dict, Iterable
+
+from profiling import PROFILER
+
+
 class DocumentationGenerator:
     def __init__(self):
         self.doc_file = "project_documentation.md"
@@ -19,6 +24,15 @@ class DocumentationGenerator:
 
 
     def generate_docs(self, analysis_results, dependency_data, project_dir):
+        self.stream_docs(analysis_results, dependency_data, project_dir)
+
+    def stream_docs(self, analysis_results: Iterable[Dict], dependency_data: Dict, project_dir):
+        """Write the docs while `analysis_results` is still being produced.
+
+        Each file's functions are written as its result arrives.
+        `dependency_data` is only read once the results are exhausted, so it
+        may be filled in by the same pipeline that yields them.
+        """
         with open(self.doc_file, "w") as f:
             # Project Overview
             f.write("# Project Documentation\n\n")
@@ -28,19 +42,15 @@ class DocumentationGenerator:
             # Function Documentation
             f.write("## Functions\n\n")
             for result in analysis_results:
-                for func in result['functions']:
-                    f.write(f"### {func['name']}\n")
-                    f.write(f"{func['description']}\n\n")
+                with PROFILER.stage('doc_write'):
+                    for func in result['functions']:
+                        f.write(f"### {func['name']}\n")
+                        f.write(f"{func['description']}\n\n")
 
             # Code Analysis Details
             f.write("## Code Analysis\n\n")
-            for func_name, deps in dependency_data.items():
-                f.write(f"### Function: {func_name}\n")
-                complexity = len(deps.callees) + len(deps.variables_used)
-                risk_level = "🟢 Green" if complexity <= 4 else "🟡 Yellow" if complexity <= 8 else "🔴 Red"
-                f.write(f"**Complexity Score:** {complexity}\n")
-                f.write(f"**Dependencies:** {', '.join(deps.callees)}\n")
-                f.write(f"**Risk Level:** {risk_level}\n\n")
+            with PROFILER.stage('doc_write'):
+                self._write_code_analysis(f, dependency_data)
             # Contributing Guidelines
             f.write("## Contributing\n")
             f.write("Guidelines for contributing to this project\n\n")
@@ -48,3 +58,12 @@ class DocumentationGenerator:
             # License
             f.write("## License\n")
             f.write("MIT License\n")
+
+    def _write_code_analysis(self, f, dependency_data: Dict):
+        for func_name, deps in dependency_data.items():
+            f.write(f"### Function: {func_name}\n")
+            complexity = len(deps.callees) + len(deps.variables_used)
+            risk_level = "🟢 Green" if complexity <= 4 else "🟡 Yellow" if complexity <= 8 else "🔴 Red"
+            f.write(f"**Complexity Score:** {complexity}\n")
+            f.write(f"**Dependencies:** {', '.join(deps.callees)}\n")
+            f.write(f"**Risk Level:** {risk_level}\n\n")
@@ -0,0 +1,221 @@
+import hashlib
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+from profiling import PROFILER
+
+BRANCH_TYPES = {'if_statement', 'for_statement', 'while_statement', 'try_statement'}
+IMPORT_TYPES = {'import_statement', 'import_from_statement'}
+
+# Same order as OPERATION_PATTERNS in benchmarks/query_compilation.py
+OPERATION_TYPES = ['sorting', 'arithmetic', 'json', 'list_ops', 'string_ops']
+
+
+@dataclass
+class FunctionRecord:
+    name: str
+    qualname: str = ""
+    digest: str = ""
+    branches: int = 0
+    calls: int = 0
+    operations: Set[str] = field(default_factory=set)
+    callees: Set[str] = field(default_factory=set)
+    variables_used: Set[str] = field(default_factory=set)
+    variables_modified: Set[str] = field(default_factory=set)
+
+    def complexity(self) -> Dict[str, int]:
+        return {
+            'branches': self.branches,
+            'calls': self.calls,
+            'complexity_score': self.branches + self.calls
+        }
+
+    def operation_flags(self) -> Dict[str, bool]:
+        return {op_type: True for op_type in OPERATION_TYPES if op_type in self.operations}
+
+    def to_dict(self) -> Dict:
+        return {
+            'name': self.name,
+            'qualname': self.qualname,
+            'digest': self.digest,
+            'branches': self.branches,
+            'calls': self.calls,
+            'operations': sorted(self.operations),
+            'callees': sorted(self.callees),
+            'variables_used': sorted(self.variables_used),
+            'variables_modified': sorted(self.variables_modified)
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'FunctionRecord':
+        return cls(
+            name=data['name'],
+            qualname=data['qualname'],
+            digest=data['digest'],
+            branches=data['branches'],
+            calls=data['calls'],
+            operations=set(data['operations']),
+            callees=set(data['callees']),
+            variables_used=set(data['variables_used']),
+            variables_modified=set(data['variables_modified'])
+        )
+
+
+@dataclass
+class FileAnalysis:
+    file_path: str
+    description: str = ""
+    imports: List[str] = field(default_factory=list)
+    functions: List[FunctionRecord] = field(default_factory=list)
+
+    def to_dict(self) -> Dict:
+        # The path is left out so the entry can be cached by content alone
+        return {
+            'description': self.description,
+            'imports': self.imports,
+            'functions': [record.to_dict() for record in self.functions]
+        }
+
+    @classmethod
+    def from_dict(cls, file_path: str, data: Dict) -> 'FileAnalysis':
+        return cls(
+            file_path=file_path,
+            description=data['description'],
+            imports=data['imports'],
+            functions=[FunctionRecord.from_dict(record) for record in data['functions']]
+        )
+
+
+class _Frame:
+    __slots__ = ('depth', 'record', 'body_start', 'body_end')
+
+    def __init__(self, depth, record, body_start, body_end):
+        self.depth = depth
+        self.record = record
+        self.body_start = body_start
+        self.body_end = body_end
+
+
+def read_source(file_path: str) -> bytes:
+    """The file as UTF-8 bytes with newlines normalized, as text mode reads it."""
+    with PROFILER.stage('read'):
+        with open(file_path, 'r', encoding='utf8') as f:
+            code = f.read()
+        source = bytes(code, "utf8")
+    PROFILER.count('bytes_read', len(source))
+    return source
+
+
+def scan_file(parser, file_path: str) -> FileAnalysis:
+    return scan_source(parser, read_source(file_path), file_path)
+
+
+def scan_source(parser, source: bytes, file_path: str) -> FileAnalysis:
+    with PROFILER.stage('parse'):
+        tree = parser.parse(source)
+    PROFILER.count('files_parsed')
+    with PROFILER.stage('walk'):
+        return scan_tree(tree, source, file_path)
+
+
+def scan_tree(tree, source: bytes, file_path: str) -> FileAnalysis:
+    """Walk a parsed tree once and collect everything both analyzers need.
+
+    Each function keeps two scopes: the body, which feeds complexity and
+    operations for CodeAnalyzer, and the whole definition, which feeds the
+    callees and variables for DependencyTracker. Nested functions count
+    towards every enclosing function, like the per-node queries did.
+    """
+    analysis = FileAnalysis(file_path=file_path)
+    description: Optional[str] = None
+    frames: List[_Frame] = []
+    # (depth, name) of every enclosing class and function, for qualified names
+    scopes: List[tuple] = []
+
+    def text(node) -> str:
+        return source[node.start_byte:node.end_byte].decode('utf8')
+
+    cursor = tree.walk()
+    depth = 0
+    visited = 0
+    while True:
+        visited += 1
+        node = cursor.node
+        node_type = node.type
+
+        if node_type == 'function_definition':
+            name = text(node.child_by_field_name('name'))
+            record = FunctionRecord(
+                name=name,
+                qualname='.'.join([scope for _, scope in scopes] + [name]),
+                digest=hashlib.sha1(source[node.start_byte:node.end_byte]).hexdigest()
+            )
+            body = node.child_by_field_name('body')
+            analysis.functions.append(record)
+            frames.append(_Frame(depth, record, body.start_byte, body.end_byte))
+            scopes.append((depth, name))
+        elif node_type == 'class_definition':
+            scopes.append((depth, text(node.child_by_field_name('name'))))
+        elif node_type in IMPORT_TYPES:
+            analysis.imports.append(text(node))
+        elif node_type == 'comment' and depth == 1 and description is None:
+            description = text(node).strip('# ')
+
+        if frames:
+            _visit(node, node_type, frames, text)
+
+        if cursor.goto_first_child():
+            depth += 1
+            continue
+        while not cursor.goto_next_sibling():
+            if not cursor.goto_parent():
+                analysis.description = description or ""
+                PROFILER.count('nodes_visited', visited)
+                return analysis
+            depth -= 1
+            while frames and frames[-1].depth > depth:
+                frames.pop()
+            while scopes and scopes[-1][0] > depth:
+                scopes.pop()
+        while frames and frames[-1].depth >= depth:
+            frames.pop()
+        while scopes and scopes[-1][0] >= depth:
+            scopes.pop()
+
+
+def _visit(node, node_type, frames, text):
+    if node_type == 'identifier':
+        name = text(node)
+        for frame in frames:
+            frame.record.variables_used.add(name)
+        return
+
+    in_body = [frame for frame in frames
+               if frame.body_start <= node.start_byte and node.end_byte <= frame.body_end]
+
+    if node_type == 'call':
+        function = node.child_by_field_name('function')
+        callee = text(function) if function.type == 'identifier' else None
+        is_json = (function.type == 'attribute' and
+                   function.child_by_field_name('object').type == 'identifier')
+        if callee:
+            for frame in frames:
+                frame.record.callees.add(callee)
+        for frame in in_body:
+            frame.record.calls += 1
+            if callee:
+                frame.record.operations.update(('sorting', 'list_ops', 'string_ops'))
+            if is_json:
+                frame.record.operations.add('json')
+    elif node_type == 'assignment':
+        left = node.child_by_field_name('left')
+        if left.type == 'identifier':
+            name = text(left)
+            for frame in frames:
+                frame.record.variables_modified.add(name)
+    elif node_type in BRANCH_TYPES:
+        for frame in in_body:
+            frame.record.branches += 1
+    elif node_type == 'binary_operator':
+        for frame in in_body:
+            frame.record.operations.add('arithmetic')
@@ -1,114 +1,210 @@
 import ast
 import glob
-from typing import Dict
+import shutil
+import tempfile
+from typing import Dict, Iterable, Iterator, List, Tuple
 from pathlib import Path
 import json
 from datetime import datetime
-from ai_documenter import AIDocumenter
+from ai_documenter import DEFAULT_BATCH_SIZE, AIDocumenter
+from analysis_cache import AnalysisCache, content_hash
+from profiling import PROFILER
 
 class EnhancedCodeAnalyzer:
-    def __init__(self, path: str):
+    def __init__(self, path: str, cache: AnalysisCache = None, warm_up: bool = False,
+                 granularity: str = 'file', batch_size: int = DEFAULT_BATCH_SIZE,
+                 retry_fallbacks: bool = False):
         self.path = path
+        self.cache = cache
         self.is_directory = Path(path).is_dir()
-        self.analyzers = {}
+        self.files: List[str] = []
         self.project_name = Path(path).name.upper()
-        self.ai_documenter = AIDocumenter()
+        # 'file' describes each module as a whole, 'function' each function
+        self.granularity = granularity
+        # The model loads on the first description that is not cached;
+        # warm_up loads it in the background while files are analyzed
+        self.ai_documenter = AIDocumenter(warm_up=warm_up, cache=cache, batch_size=batch_size,
+                                          retry_fallbacks=retry_fallbacks)
+        # The file iter_analyze parsed last, reused by the report for insights
+        self._last_semantic = None
         self.initialize_analyzers()
 
     def initialize_analyzers(self):
+        # Only the paths are collected here; each file is read and parsed when
+        # its turn comes in iter_analyze, then released
         if self.is_directory:
-            for file in glob.glob(f"{self.path}/**/*.py", recursive=True):
-                self.analyzers[file] = CodeSemanticAnalyzer(file)
+            self.files = glob.glob(f"{self.path}/**/*.py", recursive=True)
         else:
-            self.analyzers[self.path] = CodeSemanticAnalyzer(self.path)
+            self.files = [self.path]
 
     def analyze_with_details(self) -> Dict:
-        results = {}
-        for file_path, analyzer in self.analyzers.items():
-            functions = {}
-            for node in ast.walk(analyzer.tree):
-                if isinstance(node, ast.FunctionDef):
-                    functions[node.name] = analyzer.analyze_function(node)
+        return dict(self.iter_analyze())
 
-            file_summary = analyzer.generate_file_summary(functions)
-            results[file_path] = {
-                'purpose': file_summary,
-                'functions': functions
-            }
-        return results
+    def iter_analyze(self) -> Iterator[Tuple[str, Dict]]:
+        """Yield (file_path, analysis) one file at a time.
 
+        The file's source and AST go out of scope as soon as its result is
+        yielded, so only one file is ever held in memory.
+        """
+        for file_path in self.files:
+            with PROFILER.stage('semantic_analysis'):
+                analyzer = CodeSemanticAnalyzer(file_path)
+                self._last_semantic = analyzer
+                functions = self._analyze_functions(analyzer)
+                result = {
+                    'purpose': analyzer.generate_file_summary(functions),
+                    'functions': functions
+                }
+            PROFILER.count('files_analyzed')
+            yield file_path, result
+
+    def _analyze_functions(self, analyzer: 'CodeSemanticAnalyzer') -> Dict:
+        if self.cache is None:
+            return analyzer.analyze_functions()
+
+        key = content_hash(analyzer.code.encode('utf-8'))
+        functions = self.cache.get('semantic_functions', key)
+        if functions is None:
+            functions = analyzer.analyze_functions()
+            self.cache.put('semantic_functions', key, functions)
+        return functions
 
     def generate_project_structure(self) -> str:
         structure = []
         base_path = Path(self.path)
-        for file_path in self.analyzers.keys():
+        for file_path in self.files:
             rel_path = Path(file_path).relative_to(base_path)
             structure.append(f"├── {rel_path}")
         return "\n".join(structure)
 
     def save_analysis_report(self, results, output_file='project_documentation.md'):
-        with open(output_file, 'w', encoding='utf-8') as f:
-            # Project Header
-            f.write(f"# {self.project_name}\n\n")
-
-            # Description
-            f.write("## Description\n")
-            f.write(self._generate_project_description(results))
-            f.write("\n\n")
-
-            # Features
-            f.write("## Features\n")
-            features = self._extract_key_features(results)
-            for feature in features:
-                f.write(f"- {feature}\n")
-            f.write("\n")
-
-            # Project Structure
-            f.write("## Project Structure\n")
-            f.write("```\n")
-            f.write(self.generate_project_structure())
-            f.write("\n```\n\n")
-
-            # Module Details
-            f.write("## Module Details\n")
-            for file_path, analysis in results.items():
+        self.stream_analysis_report(results.items(), output_file)
+
+    def stream_analysis_report(self, results: Iterable[Tuple[str, Dict]],
+                               output_file='project_documentation.md'):
+        """Write the report from (file_path, analysis) pairs as they arrive.
+
+        Per-file sections are spooled to temporary files while the totals
+        and features for the header are accumulated, then everything is
+        stitched together in order. Pass iter_analyze() to keep memory flat.
+        """
+        total_modules = 0
+        total_functions = 0
+        features = set()
+        # Code waiting to be described, batched across files in report order
+        pending_insights = []
+        with tempfile.TemporaryFile('w+', encoding='utf-8') as details, \
+                tempfile.TemporaryFile('w+', encoding='utf-8') as insights, \
+                tempfile.TemporaryFile('w+', encoding='utf-8') as examples:
+            for file_path, analysis in results:
+                single = {file_path: analysis}
+                total_modules += 1
+                total_functions += len(analysis['functions'])
+                features.update(self._extract_key_features(single))
+
                 rel_path = Path(file_path).relative_to(Path(self.path))
-                f.write(f"### {rel_path}\n")
-                f.write(f"{analysis['purpose']}\n\n")
-                f.write("#### Functions\n")
-                for func_name, details in analysis['functions'].items():
-                    f.write(f"- `{func_name}()`: {details['description']}\n")
+                details.write(f"### {rel_path}\n")
+                details.write(f"{analysis['purpose']}\n\n")
+                details.write("#### Functions\n")
+                for func_name, details_entry in analysis['functions'].items():
+                    details.write(f"- `{func_name}()`: {details_entry['description']}\n")
+                details.write("\n")
+
+                semantic = self._semantic_analyzer(file_path)
+                pending_insights.extend(self._insight_requests(semantic))
+                if len(pending_insights) >= self.ai_documenter.batch_size:
+                    self._write_insights(insights, pending_insights)
+
+                self._write_example_usage(examples, single)
+            self._write_insights(insights, pending_insights)
+
+            with PROFILER.stage('report_write'), open(output_file, 'w', encoding='utf-8') as f:
+                # Project Header
+                f.write(f"# {self.project_name}\n\n")
+
+                # Description
+                f.write("## Description\n")
+                f.write(self._describe_project(total_modules, total_functions))
+                f.write("\n\n")
+
+                # Features
+                f.write("## Features\n")
+                for feature in sorted(features):
+                    f.write(f"- {feature}\n")
                 f.write("\n")
 
-            # Dependencies
-            f.write("## Dependencies\n")
-            f.write("- Python 3.x\n")
-            f.write("- Required packages listed in requirements.txt\n\n")
+                # Project Structure
+                f.write("## Project Structure\n")
+                f.write("```\n")
+                f.write(self.generate_project_structure())
+                f.write("\n```\n\n")
+
+                # Module Details
+                f.write("## Module Details\n")
+                details.seek(0)
+                shutil.copyfileobj(details, f)
+
+                # Dependencies
+                f.write("## Dependencies\n")
+                f.write("- Python 3.x\n")
+                f.write("- Required packages listed in requirements.txt\n\n")
+
+                # Add new AI Insights section
+                f.write("## AI Analysis Insights\n\n")
+                insights.seek(0)
+                shutil.copyfileobj(insights, f)
+
+                # Add Architecture Patterns
+                f.write("## Architecture Patterns\n\n")
 
-            # Add new AI Insights section
-            f.write("## AI Analysis Insights\n\n")
-            for file_path, analysis in results.items():
-                f.write(f"### {Path(file_path).name}\n")
-                code_insights = self.ai_documenter.generate_description(self.analyzers[file_path].code)
-                f.write(f"{code_insights}\n\n")
 
-            # Add Architecture Patterns
-            f.write("## Architecture Patterns\n\n")
+                # Usage
+                f.write("## Usage\n")
+                f.write("```python\n")
+                f.write("# Example usage of key functions\n")
+                examples.seek(0)
+                shutil.copyfileobj(examples, f)
+                f.write("```\n\n")
 
+                # Footer
+                f.write(f"\n*Documentation generated on {datetime.now().strftime('%Y-%m-%d')}*\n")
 
-            # Usage
-            f.write("## Usage\n")
-            f.write("```python\n")
-            f.write("# Example usage of key functions\n")
-            self._write_example_usage(f, results)
-            f.write("```\n\n")
+    def _semantic_analyzer(self, file_path: str) -> 'CodeSemanticAnalyzer':
+        # Streaming from iter_analyze, the file was just read (and maybe
+        # parsed) for its analysis; reuse it instead of reading it again
+        if self._last_semantic is not None and self._last_semantic.file_path == file_path:
+            return self._last_semantic
+        semantic = CodeSemanticAnalyzer(file_path)
+        PROFILER.count('bytes_read', len(semantic.code))
+        return semantic
 
-            # Footer
-            f.write(f"\n*Documentation generated on {datetime.now().strftime('%Y-%m-%d')}*\n")
+    def _insight_requests(self, semantic: 'CodeSemanticAnalyzer') -> List[Tuple[str, str, str]]:
+        """(prefix, code, suffix) triples for one file's AI insights."""
+        heading = f"### {Path(semantic.file_path).name}\n"
+        if self.granularity == 'function':
+            sources = semantic.function_sources()
+            if sources:
+                requests = [(f"- `{name}()`: ", source, "\n") for name, source in sources.items()]
+                first_prefix, code, suffix = requests[0]
+                requests[0] = (heading + first_prefix, code, suffix)
+                prefix, code, _ = requests[-1]
+                requests[-1] = (prefix, code, "\n\n")
+                return requests
+        return [(heading, semantic.code, "\n\n")]
+
+    def _write_insights(self, file, pending: List[Tuple[str, str, str]]):
+        with PROFILER.stage('ai_description'):
+            descriptions = self.ai_documenter.generate_descriptions([code for _, code, _ in pending])
+        for (prefix, _, suffix), description in zip(pending, descriptions):
+            file.write(f"{prefix}{description}{suffix}")
+        pending.clear()
 
     def _generate_project_description(self, results) -> str:
         total_modules = len(results)
         total_functions = sum(len(analysis['functions']) for analysis in results.values())
+        return self._describe_project(total_modules, total_functions)
+
+    def _describe_project(self, total_modules: int, total_functions: int) -> str:
         return f"A Python project consisting of {total_modules} modules with {total_functions} functions implementing various data processing and analysis capabilities."
 
     def _extract_key_features(self, results) -> list:
@@ -138,7 +234,31 @@ class CodeSemanticAnalyzer:
         self.file_path = file_path
         with open(file_path, 'r', encoding='utf-8') as file:
             self.code = file.read()
-        self.tree = ast.parse(self.code)
+        self._tree = None
+
+    @property
+    def tree(self) -> ast.Module:
+        # Parsed on first use so cached files are never parsed at all
+        if self._tree is None:
+            with PROFILER.stage('parse'):
+                self._tree = ast.parse(self.code)
+            PROFILER.count('files_parsed')
+        return self._tree
+
+    def function_sources(self) -> Dict[str, str]:
+        # Same functions, keyed the same way, as analyze_functions()
+        sources = {}
+        for node in ast.walk(self.tree):
+            if isinstance(node, ast.FunctionDef):
+                sources[node.name] = ast.get_source_segment(self.code, node)
+        return sources
+
+    def analyze_functions(self) -> Dict:
+        functions = {}
+        for node in ast.walk(self.tree):
+            if isinstance(node, ast.FunctionDef):
+                functions[node.name] = self.analyze_function(node)
+        return functions
 
     def analyze_function(self, node: ast.FunctionDef) -> Dict:
         operations = self._get_operations(node)
@@ -177,10 +297,35 @@ if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser(description='Code Analysis Tool')
     parser.add_argument('--path', type=str, required=True, help='Path to file or directory')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Re-parse every file instead of using the on-disk analysis cache')
+    parser.add_argument('--profile', nargs='?', const='profile_trace.json', metavar='TRACE_FILE',
+                        help='Print per-stage timings and write a Chrome trace')
+    parser.add_argument('--granularity', choices=['file', 'function'], default='file',
+                        help='Generate AI insights per file or per function')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help='Code snippets per model batch for AI insights')
+    parser.add_argument('--warm-up', action='store_true',
+                        help='Load the AI model in the background while files are analyzed')
+    parser.add_argument('--retry-ai-fallbacks', action='store_true',
+                        help='Regenerate cached line-count descriptions with the AI model')
     args = parser.parse_args()
+    if args.profile:
+        PROFILER.enable()
+    cache = None if args.no_cache else AnalysisCache()
 
     print(f"Analyzing: {args.path}")
-    analyzer = EnhancedCodeAnalyzer(args.path)
-    results = analyzer.analyze_with_details()
-    analyzer.save_analysis_report(results)
+    analyzer = EnhancedCodeAnalyzer(args.path, cache=cache, warm_up=args.warm_up,
+                                    granularity=args.granularity, batch_size=args.batch_size,
+                                    retry_fallbacks=args.retry_ai_fallbacks)
+    analyzer.stream_analysis_report(analyzer.iter_analyze())
     print("Documentation generated successfully!")
+    if cache is not None:
+        print(cache.stats())
+        PROFILER.count('cache_hits', cache.hits)
+        PROFILER.count('cache_misses', cache.misses)
+        cache.close()
+    if args.profile:
+        print(f"\nProfile:\n{PROFILER.summary()}")
+        PROFILER.write_trace(args.profile)
+        print(f"Trace written to {args.profile}")
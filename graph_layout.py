@@ -0,0 +1,123 @@
+import hashlib
+import os
+from collections import defaultdict
+from typing import Dict, Hashable
+
+import networkx as nx
+import numpy as np
+
+from call_graph import module_name
+
+EXTERNAL_CLUSTER = "<external>"
+
+
+def graph_digest(graph: nx.DiGraph) -> str:
+    """Hash of the node and edge lists; equal graphs get the same layout."""
+    digest = hashlib.sha256()
+    for node in graph.nodes():
+        digest.update(f"{node}\n".encode('utf-8'))
+    digest.update(b"\0")
+    for source, target in graph.edges():
+        digest.update(f"{source}\t{target}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def hierarchical_layout(graph: nx.DiGraph, sweeps: int = 4) -> Dict[Hashable, np.ndarray]:
+    """Sugiyama-style layered layout in O((n + m) * sweeps).
+
+    Cycles are collapsed into their strongly connected component, each
+    component is put one layer below its lowest caller (longest path
+    layering), and nodes within a layer are ordered by the barycenter of
+    their neighbours, alternating downward and upward sweeps. Layers wider
+    than about 2*sqrt(n) nodes wrap onto extra rows so the result stays
+    roughly square. Positions are scaled into [-1, 1] like nx layouts.
+    """
+    nodes = list(graph.nodes())
+    n = len(nodes)
+    if n == 0:
+        return {}
+    index = {node: i for i, node in enumerate(nodes)}
+    edges = np.array([(index[s], index[t]) for s, t in graph.edges() if s != t],
+                     dtype=np.int64).reshape(-1, 2)
+
+    condensed = nx.condensation(graph)
+    component_layer = {}
+    for component in nx.topological_sort(condensed):
+        component_layer[component] = max(
+            (component_layer[parent] + 1 for parent in condensed.predecessors(component)),
+            default=0
+        )
+    mapping = condensed.graph['mapping']
+    layer = np.array([component_layer[mapping[node]] for node in nodes], dtype=np.int64)
+
+    rank = _ranks_within_layers(layer, np.arange(n, dtype=np.float64))
+    for sweep in range(sweeps):
+        # Down sweeps order by callers, up sweeps by callees
+        source, target = (edges[:, 0], edges[:, 1]) if sweep % 2 == 0 else (edges[:, 1], edges[:, 0])
+        counts = np.bincount(target, minlength=n)
+        totals = np.bincount(target, weights=rank[source], minlength=n)
+        barycenter = np.where(counts > 0, totals / np.maximum(counts, 1), rank)
+        rank = _ranks_within_layers(layer, barycenter)
+
+    width = max(1, int(np.ceil(2 * np.sqrt(n))))
+    layer_sizes = np.bincount(layer)
+    rows_per_layer = (layer_sizes + width - 1) // width
+    first_row = np.concatenate(([0], np.cumsum(rows_per_layer)[:-1]))
+    row = first_row[layer] + rank.astype(np.int64) // width
+    column = rank % width
+    # Centre every row on x = 0
+    row_sizes = np.bincount(row)
+    x = column - (row_sizes[row] - 1) / 2
+    y = -row.astype(np.float64)
+
+    positions = np.column_stack((x, y))
+    positions -= positions.mean(axis=0)
+    scale = np.abs(positions).max()
+    if scale > 0:
+        positions /= scale
+    return {node: positions[i] for i, node in enumerate(nodes)}
+
+
+def _ranks_within_layers(layer: np.ndarray, key: np.ndarray) -> np.ndarray:
+    # Position of each node within its layer when the layer is sorted by key
+    order = np.lexsort((key, layer))
+    sorted_layers = layer[order]
+    starts = np.searchsorted(sorted_layers, sorted_layers, side='left')
+    rank = np.empty(len(layer), dtype=np.float64)
+    rank[order] = np.arange(len(layer)) - starts
+    return rank
+
+
+def module_clusters(graph: nx.DiGraph, dependency_data, root: str = None) -> Dict[Hashable, str]:
+    """Module of every node; callees outside the project share one cluster."""
+    clusters = {}
+    for node in graph.nodes():
+        deps = dependency_data.get(node)
+        clusters[node] = module_name(deps.file_path, root) if deps is not None else EXTERNAL_CLUSTER
+    return clusters
+
+
+def collapse_clusters(graph: nx.DiGraph, clusters: Dict[Hashable, str]) -> nx.DiGraph:
+    """One node per cluster (with a `size` member count) and weighted edges between them."""
+    collapsed = nx.DiGraph()
+    sizes = defaultdict(int)
+    for node in graph.nodes():
+        sizes[clusters[node]] += 1
+    for cluster, size in sizes.items():
+        collapsed.add_node(cluster, size=size)
+    weights = defaultdict(int)
+    for source, target in graph.edges():
+        if clusters[source] != clusters[target]:
+            weights[clusters[source], clusters[target]] += 1
+    for (source, target), weight in weights.items():
+        collapsed.add_edge(source, target, weight=weight)
+    return collapsed
+
+
+def project_root(dependency_data) -> str:
+    """Common directory of the analyzed files, used to name modules."""
+    paths = [os.path.abspath(deps.file_path) for deps in dependency_data.values()]
+    if not paths:
+        return os.getcwd()
+    root = os.path.commonpath(paths)
+    return os.path.dirname(root) if len(set(paths)) == 1 else root
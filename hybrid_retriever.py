@@ -0,0 +1,141 @@
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from pydantic import ConfigDict
+
+from symbol_index import SymbolIndex
+
+IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+CAMEL_PART = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z0-9]+")
+
+
+def identifier_tokens(text: str) -> List[str]:
+    """Identifiers in `text`, lowercased, plus their snake_case/camelCase parts."""
+    tokens = []
+    for identifier in IDENTIFIER.findall(text):
+        tokens.append(identifier.lower())
+        parts = [part.lower() for piece in identifier.split('_') for part in CAMEL_PART.findall(piece)]
+        if len(parts) > 1:
+            tokens.extend(parts)
+    return tokens
+
+
+class BM25Index:
+    """Inverted index over code identifiers scored with Okapi BM25."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self.lengths: List[int] = []
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def add(self, text: str) -> int:
+        doc_id = len(self.lengths)
+        tokens = identifier_tokens(text)
+        for token, count in Counter(tokens).items():
+            self.postings[token][doc_id] = count
+        self.lengths.append(len(tokens))
+        return doc_id
+
+    def search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        if not self.lengths:
+            return []
+        average = sum(self.lengths) / len(self.lengths)
+        scores: Dict[int, float] = defaultdict(float)
+        for token in set(identifier_tokens(query)):
+            postings = self.postings.get(token)
+            if not postings:
+                continue
+            idf = math.log(1 + (len(self.lengths) - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, count in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[doc_id] / average)
+                scores[doc_id] += idf * count * (self.k1 + 1) / (count + norm)
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+
+
+class HybridRetriever(BaseRetriever):
+    """Fuse symbol, BM25 and vector search results for code questions.
+
+    Chunks defining a function named in the question come first; the rest
+    are ranked by reciprocal rank fusion of the BM25 identifier ranking and
+    the dense FAISS ranking. Without a vector store (nothing indexable
+    was found) only the symbol and BM25 legs run.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    vectorstore: Optional[object]
+    documents: List[Document]
+    bm25: BM25Index
+    chunks_by_name: Dict[str, List[int]]
+    symbols: Optional[SymbolIndex] = None
+    k: int = 4
+    fetch_k: int = 20
+    rrf_k: int = 60
+
+    @classmethod
+    def from_vectorstore(cls, vectorstore, symbols: SymbolIndex = None, **kwargs) -> 'HybridRetriever':
+        documents = []
+        if vectorstore is not None:
+            documents = [vectorstore.docstore.search(doc_id)
+                         for doc_id in vectorstore.index_to_docstore_id.values()]
+        bm25 = BM25Index()
+        chunks_by_name = defaultdict(list)
+        for document in documents:
+            doc_id = bm25.add(document.page_content)
+            chunks_by_name[document.metadata.get('qualified_name')].append(doc_id)
+        if symbols is not None:
+            symbols.add_locations(document.metadata for document in documents)
+        return cls(vectorstore=vectorstore, documents=documents, bm25=bm25,
+                   chunks_by_name=dict(chunks_by_name), symbols=symbols, **kwargs)
+
+    def _get_relevant_documents(self, query: str, *,
+                                run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return self.retrieve(query)
+
+    def retrieve(self, query: str, embedding: Optional[List[float]] = None) -> List[Document]:
+        """Fused results for `query`; pass its embedding if already computed
+        so the dense search does not embed it again."""
+        scores: Dict[str, float] = defaultdict(float)
+        by_key: Dict[str, Document] = {}
+
+        for rank, (doc_id, _) in enumerate(self.bm25.search(query, self.fetch_k)):
+            document = self.documents[doc_id]
+            by_key[document.page_content] = document
+            scores[document.page_content] += 1 / (self.rrf_k + rank + 1)
+        if self.vectorstore is None:
+            dense = []
+        elif embedding is not None:
+            dense = self.vectorstore.similarity_search_by_vector(embedding, k=self.fetch_k)
+        else:
+            dense = self.vectorstore.similarity_search(query, k=self.fetch_k)
+        for rank, document in enumerate(dense):
+            by_key[document.page_content] = document
+            scores[document.page_content] += 1 / (self.rrf_k + rank + 1)
+
+        if self.symbols is not None:
+            for qualified_name in self.symbols.mentioned(query):
+                for doc_id in self._enclosing_chunks(qualified_name):
+                    document = self.documents[doc_id]
+                    by_key[document.page_content] = document
+                    scores[document.page_content] += 1.0
+
+        ranked = sorted(scores, key=lambda key: -scores[key])
+        return [by_key[key] for key in ranked[:self.k]]
+
+    def _enclosing_chunks(self, qualified_name: str) -> List[int]:
+        # Methods of small classes live in their class's chunk
+        parts = qualified_name.split('.')
+        for end in range(len(parts), 0, -1):
+            doc_ids = self.chunks_by_name.get('.'.join(parts[:end]))
+            if doc_ids:
+                return doc_ids
+        return []
@@ -0,0 +1,118 @@
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Optional
+
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_READ_WORKERS = 4
+# Embedded batches allowed to wait for the index; bounds memory on huge repos
+MAX_PENDING_BATCHES = 2
+
+
+@dataclass
+class IngestionStats:
+    files: int = 0
+    chunks: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.seconds if self.seconds else 0.0
+
+
+def print_progress(stats: IngestionStats, total_files: int):
+    sys.stdout.write(f"\rEmbedded {stats.chunks} chunks from {stats.files}/{total_files} files "
+                     f"({stats.chunks_per_second:.1f} chunks/s)")
+    if stats.files == total_files:
+        sys.stdout.write("\n")
+    sys.stdout.flush()
+
+
+class IngestionPipeline:
+    """Read, chunk and embed files with reading and embedding overlapped.
+
+    A thread pool loads and chunks files while a single embedding worker
+    turns fixed-size batches of chunks into vectors; each finished batch is
+    handed to `add_batch` straight away so the index grows as it goes.
+    Only a few files and batches are in flight at once, so memory stays
+    flat however large the repository is.
+    """
+
+    def __init__(self, embeddings, load_documents: Callable[[str], List],
+                 batch_size: int = DEFAULT_BATCH_SIZE, read_workers: int = DEFAULT_READ_WORKERS,
+                 progress: Optional[Callable[[IngestionStats, int], None]] = None):
+        self.embeddings = embeddings
+        self.load_documents = load_documents
+        self.batch_size = max(1, batch_size)
+        self.read_workers = max(1, read_workers)
+        self.progress = progress
+
+    def run(self, file_paths: List[str], add_batch: Callable,
+            on_file: Optional[Callable[[str, List], None]] = None) -> IngestionStats:
+        """Ingest `file_paths`, calling add_batch(text_embeddings, metadatas, ids) per batch.
+
+        on_file(path, ids) is called once a file has been chunked with the
+        document IDs its chunks will be stored under.
+        """
+        stats = IngestionStats()
+        start = time.perf_counter()
+        pending = deque()
+        texts, metadatas, ids, batch_files = [], [], [], 0
+
+        def finish(future):
+            vectors, batch_texts, batch_metadatas, batch_ids, files = future.result()
+            add_batch(list(zip(batch_texts, vectors)), batch_metadatas, batch_ids)
+            stats.files += files
+            stats.chunks += len(batch_ids)
+            stats.batches += 1
+            stats.seconds = time.perf_counter() - start
+            if self.progress:
+                self.progress(stats, len(file_paths))
+
+        with ThreadPoolExecutor(max_workers=self.read_workers) as readers, \
+                ThreadPoolExecutor(max_workers=1) as embedder:
+
+            def submit():
+                nonlocal texts, metadatas, ids, batch_files
+                pending.append(embedder.submit(self._embed, texts, metadatas, ids, batch_files))
+                texts, metadatas, ids, batch_files = [], [], [], 0
+                while len(pending) > MAX_PENDING_BATCHES:
+                    finish(pending.popleft())
+
+            for path, documents in self._read(readers, file_paths):
+                file_ids = [f"{path}#{i}" for i in range(len(documents))]
+                if on_file:
+                    on_file(path, file_ids)
+                for document, doc_id in zip(documents, file_ids):
+                    texts.append(document.page_content)
+                    metadatas.append(document.metadata)
+                    ids.append(doc_id)
+                    if len(texts) >= self.batch_size:
+                        submit()
+                batch_files += 1
+            if texts or batch_files:
+                submit()
+            while pending:
+                finish(pending.popleft())
+
+        stats.seconds = time.perf_counter() - start
+        return stats
+
+    def _read(self, readers: ThreadPoolExecutor, file_paths: Iterable[str]):
+        # Keep a bounded window of reads ahead of the consumer, in input order
+        window = deque()
+        for path in file_paths:
+            window.append((path, readers.submit(self.load_documents, path)))
+            if len(window) >= self.read_workers * 4:
+                path, future = window.popleft()
+                yield path, future.result()
+        while window:
+            path, future = window.popleft()
+            yield path, future.result()
+
+    def _embed(self, texts, metadatas, ids, files):
+        vectors = self.embeddings.embed_documents(texts) if texts else []
+        return vectors, texts, metadatas, ids, files
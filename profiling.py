@@ -0,0 +1,114 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler._record(self.name, self.start, time.perf_counter_ns())
+        return False
+
+
+class Profiler:
+    """Per-stage timers and counters for the analysis pipeline.
+
+    Disabled by default: stage() hands back a shared no-op context manager
+    and count() returns after a single attribute check, so instrumented code
+    pays next to nothing unless --profile is given.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.totals = defaultdict(int)
+        self.calls = defaultdict(int)
+        self.counters = defaultdict(int)
+        self.events = []
+        self.origin = time.perf_counter_ns()
+
+    def enable(self):
+        self.reset()
+        self.enabled = True
+
+    def stage(self, name: str):
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def count(self, name: str, amount: int = 1):
+        if self.enabled:
+            self.counters[name] += amount
+
+    def merge(self, origin: int, events: list):
+        """Fold in the stages another process's profiler recorded since its origin."""
+        if not self.enabled:
+            return
+        shift = (origin - self.origin) / 1000
+        with self._lock:
+            for event in events:
+                self.totals[event['name']] += round(event['dur'] * 1000)
+                self.calls[event['name']] += 1
+                self.events.append(dict(event, ts=event['ts'] + shift))
+
+    def _record(self, name: str, start: int, end: int):
+        with self._lock:
+            self.totals[name] += end - start
+            self.calls[name] += 1
+            self.events.append({
+                'name': name,
+                'ph': 'X',
+                'ts': (start - self.origin) / 1000,
+                'dur': (end - start) / 1000,
+                'pid': os.getpid(),
+                'tid': threading.get_ident()
+            })
+
+    def summary(self) -> str:
+        lines = [f"{'stage':<24}{'calls':>8}{'total (s)':>12}{'mean (ms)':>12}"]
+        for name, total in sorted(self.totals.items(), key=lambda item: -item[1]):
+            calls = self.calls[name]
+            lines.append(f"{name:<24}{calls:>8}{total / 1e9:>12.3f}{total / calls / 1e6:>12.3f}")
+        if self.counters:
+            lines.append("")
+            lines.append(f"{'counter':<24}{'value':>20}")
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"{name:<24}{value:>20}")
+        return "\n".join(lines)
+
+    def write_trace(self, path: str):
+        """Write a Chrome trace (chrome://tracing, Perfetto) with the counters attached."""
+        with open(path, 'w') as f:
+            json.dump({
+                'traceEvents': self.events,
+                'displayTimeUnit': 'ms',
+                'otherData': dict(self.counters)
+            }, f)
+
+
+PROFILER = Profiler()
@@ -0,0 +1,281 @@
+"""Serve CodeQASystem to many clients over HTTP or a Unix socket.
+
+One model and index are loaded and shared. Questions are queued fairly
+across clients (round-robin by client id) and answered one at a time by a
+single generation thread, with tokens streamed back as they are produced.
+
+    python qa_server.py data_analysis_project --port 8765
+    curl -N -d '{"question": "What does DataProcessor do?"}' localhost:8765/ask
+    curl localhost:8765/metrics
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from code_qa import CodeQASystem
+
+_DONE = object()
+
+
+@dataclass
+class QARequest:
+    client: str
+    question: str
+    tokens: asyncio.Queue = field(default_factory=asyncio.Queue)
+    received: float = field(default_factory=time.perf_counter)
+    started: Optional[float] = None
+    first_token: Optional[float] = None
+    finished: Optional[float] = None
+    token_count: int = 0
+    cancelled: bool = False
+    reader: Optional[asyncio.StreamReader] = None
+    writer: Optional[asyncio.StreamWriter] = None
+
+    def disconnected(self) -> bool:
+        # The body has been read, so EOF means the client hung up
+        return ((self.reader is not None and self.reader.at_eof()) or
+                (self.writer is not None and self.writer.is_closing()))
+
+
+class FairQueue:
+    """Per-client FIFO queues served round-robin.
+
+    A client that sends many questions at once only gets every n-th turn
+    when n clients are waiting, instead of starving everyone behind it.
+    """
+
+    def __init__(self):
+        self._queues: OrderedDict = OrderedDict()
+        self._ready = asyncio.Condition()
+
+    def __len__(self):
+        return sum(len(queue) for queue in self._queues.values())
+
+    async def put(self, request: QARequest):
+        async with self._ready:
+            self._queues.setdefault(request.client, deque()).append(request)
+            self._ready.notify()
+
+    async def get(self) -> QARequest:
+        async with self._ready:
+            await self._ready.wait_for(lambda: self._queues)
+            client, queue = next(iter(self._queues.items()))
+            request = queue.popleft()
+            # Move the client to the back of the rotation
+            del self._queues[client]
+            if queue:
+                self._queues[client] = queue
+            return request
+
+
+class ServerMetrics:
+    def __init__(self):
+        self.completed = 0
+        self.cancelled = 0
+        self.ttft: List[float] = []
+        self.queue_wait: List[float] = []
+        self.tokens_per_second: List[float] = []
+
+    def record(self, request: QARequest):
+        if request.cancelled:
+            self.cancelled += 1
+            return
+        self.completed += 1
+        self.queue_wait.append(request.started - request.received)
+        if request.first_token is not None:
+            self.ttft.append(request.first_token - request.received)
+            generation = request.finished - request.first_token
+            if request.token_count > 1 and generation > 0:
+                self.tokens_per_second.append((request.token_count - 1) / generation)
+
+    def snapshot(self, queued: int) -> Dict:
+        return {
+            'completed': self.completed,
+            'cancelled': self.cancelled,
+            'queued': queued,
+            'time_to_first_token_s': _distribution(self.ttft),
+            'queue_wait_s': _distribution(self.queue_wait),
+            'tokens_per_second': _distribution(self.tokens_per_second)
+        }
+
+
+def _distribution(values: List[float]) -> Dict:
+    if not values:
+        return {}
+    ordered = sorted(values)
+    return {
+        'mean': round(sum(ordered) / len(ordered), 4),
+        'p50': round(ordered[len(ordered) // 2], 4),
+        'p95': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 4)
+    }
+
+
+class QAServer:
+    def __init__(self, qa_system: CodeQASystem):
+        self.qa_system = qa_system
+        self.queue = FairQueue()
+        self.metrics = ServerMetrics()
+        # The model is not thread-safe; every generation runs on this thread
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765, unix_path: str = None):
+        worker = asyncio.create_task(self._worker())
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle_client, path=unix_path)
+        else:
+            server = await asyncio.start_server(self.handle_client, host, port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            worker.cancel()
+            self.executor.shutdown(wait=False)
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            request = await self.queue.get()
+            if request.cancelled or request.disconnected():
+                # Nobody is listening; don't spend a generation on it
+                request.cancelled = True
+                self.metrics.record(request)
+                request.tokens.put_nowait(_DONE)
+                continue
+            request.started = time.perf_counter()
+            await loop.run_in_executor(self.executor, self._generate, request, loop)
+            request.finished = time.perf_counter()
+            self.metrics.record(request)
+
+    def _generate(self, request: QARequest, loop):
+        try:
+            for token in self.qa_system.stream_answer(request.question):
+                if request.cancelled:
+                    break
+                loop.call_soon_threadsafe(request.tokens.put_nowait, token)
+        except Exception as e:
+            loop.call_soon_threadsafe(request.tokens.put_nowait, f"\n[error: {e}]")
+        finally:
+            loop.call_soon_threadsafe(request.tokens.put_nowait, _DONE)
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            method, path, headers, body = await _read_request(reader)
+        except (ValueError, asyncio.IncompleteReadError):
+            await _respond(writer, 400, {'error': 'malformed request'})
+            return
+
+        if method == 'GET' and path == '/metrics':
+            await _respond(writer, 200, self.metrics.snapshot(len(self.queue)))
+        elif method == 'POST' and path == '/ask':
+            try:
+                question = json.loads(body or b'{}')['question']
+            except (ValueError, KeyError):
+                await _respond(writer, 400, {'error': 'expected {"question": ...}'})
+                return
+            peer = writer.get_extra_info('peername')
+            client = headers.get('x-client-id') or (peer[0] if isinstance(peer, tuple) else 'local')
+            await self._stream(QARequest(client, question, reader=reader, writer=writer), writer)
+        else:
+            await _respond(writer, 404, {'error': 'not found'})
+
+    async def _stream(self, request: QARequest, writer: asyncio.StreamWriter):
+        await self.queue.put(request)
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/plain; charset=utf-8\r\n"
+                     b"Transfer-Encoding: chunked\r\nConnection: close\r\n\r\n")
+        try:
+            while True:
+                token = await request.tokens.get()
+                if token is _DONE:
+                    break
+                if not token:
+                    # An empty chunk is the chunked-encoding terminator
+                    continue
+                if request.first_token is None:
+                    request.first_token = time.perf_counter()
+                request.token_count += 1
+                data = token.encode('utf-8')
+                writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+                await writer.drain()
+            if not request.cancelled:
+                writer.write(b"0\r\n\r\n")
+                await writer.drain()
+        except ConnectionError:
+            # Client went away; stop generating for it
+            request.cancelled = True
+        finally:
+            await _close(writer)
+
+
+async def _read_request(reader: asyncio.StreamReader):
+    request_line = (await reader.readline()).decode('latin-1').split()
+    if len(request_line) != 3:
+        raise ValueError("bad request line")
+    method, path, _ = request_line
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode('latin-1').strip()
+        if not line:
+            break
+        name, _, value = line.partition(':')
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get('content-length', 0))
+    body = await reader.readexactly(length) if length else b''
+    return method, path, headers, body
+
+
+async def _respond(writer: asyncio.StreamWriter, status: int, payload: Dict):
+    reasons = {200: 'OK', 400: 'Bad Request', 404: 'Not Found'}
+    data = json.dumps(payload).encode('utf-8')
+    writer.write(f"HTTP/1.1 {status} {reasons[status]}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode('latin-1') + data)
+    try:
+        await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        await _close(writer)
+
+
+async def _close(writer: asyncio.StreamWriter):
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except ConnectionError:
+        pass
+
+
+def stub_qa_system(delay: float = 0.02) -> CodeQASystem:
+    """A CodeQASystem with a fake streaming LLM and embeddings, for testing."""
+    from langchain_community.embeddings import FakeEmbeddings
+    from langchain_community.llms.fake import FakeStreamingListLLM
+    llm = FakeStreamingListLLM(
+        responses=["This is a stub answer streamed one character at a time."],
+        sleep=delay
+    )
+    return CodeQASystem(llm=llm, embeddings=FakeEmbeddings(size=64))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve code questions over HTTP')
+    parser.add_argument('project_path')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help='Listen on this Unix socket instead of TCP')
+    parser.add_argument('--stub', action='store_true',
+                        help='Use a fake LLM and embeddings instead of loading the models')
+    args = parser.parse_args()
+
+    qa_system = stub_qa_system() if args.stub else CodeQASystem()
+    qa_system.load_codebase(args.project_path)
+    where = args.unix or f"http://{args.host}:{args.port}"
+    print(f"Serving questions on {where}")
+    asyncio.run(QAServer(qa_system).serve(args.host, args.port, args.unix))
+
+
+if __name__ == "__main__":
+    main()
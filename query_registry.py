@@ -0,0 +1,65 @@
+import threading
+from contextlib import contextmanager
+
+from profiling import PROFILER
+
+
+class QueryRegistry:
+    """Process-wide cache of compiled tree-sitter queries.
+
+    Queries are keyed by (language, pattern) so CodeAnalyzer and
+    DependencyTracker share one compiled object per S-expression instead of
+    recompiling it for every function body they look at.
+    """
+
+    def __init__(self):
+        self._queries = {}
+        self._lock = threading.Lock()
+        self.enabled = True
+        self.compilations = 0
+        self.lookups = 0
+
+    def get(self, language, pattern: str):
+        self.lookups += 1
+        PROFILER.count('queries_run')
+        if not self.enabled:
+            self.compilations += 1
+            PROFILER.count('queries_compiled')
+            return language.query(pattern)
+
+        key = (language.language_id, pattern)
+        query = self._queries.get(key)
+        if query is None:
+            with self._lock:
+                query = self._queries.get(key)
+                if query is None:
+                    query = language.query(pattern)
+                    self._queries[key] = query
+                    self.compilations += 1
+                    PROFILER.count('queries_compiled')
+        return query
+
+    def clear(self):
+        with self._lock:
+            self._queries.clear()
+
+    def reset_stats(self):
+        self.compilations = 0
+        self.lookups = 0
+
+    @contextmanager
+    def disabled(self):
+        # Compile on every lookup, as the analyzers did before the registry
+        previous = self.enabled
+        self.enabled = False
+        try:
+            yield self
+        finally:
+            self.enabled = previous
+
+
+QUERY_REGISTRY = QueryRegistry()
+
+
+def get_query(language, pattern: str):
+    return QUERY_REGISTRY.get(language, pattern)
@@ -0,0 +1,105 @@
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from analysis_cache import AnalysisCache
+from code_analyzer import CodeAnalyzer, DependencyNode, DependencyTracker
+
+# Navigation questions answered straight from the call graph
+CALLERS_PATTERNS = [
+    re.compile(r"\b(?:where|who|what)\b.*?\b(?:is|are)\s+`?([A-Za-z_][\w.]*)`?(?:\(\))?\s+(?:called|used|invoked|referenced)\b", re.IGNORECASE),
+    re.compile(r"\b(?:who|what)\s+(?:calls|uses|invokes)\s+`?([A-Za-z_][\w.]*)`?", re.IGNORECASE),
+    re.compile(r"\bcallers\s+of\s+`?([A-Za-z_][\w.]*)`?", re.IGNORECASE),
+]
+CALLEES_PATTERNS = [
+    re.compile(r"\bwhat\s+(?:functions\s+)?(?:does|do)\s+`?([A-Za-z_][\w.]*)`?(?:\(\))?\s+call\b", re.IGNORECASE),
+    re.compile(r"\bcallees\s+of\s+`?([A-Za-z_][\w.]*)`?", re.IGNORECASE),
+]
+DEFINITION_PATTERNS = [
+    re.compile(r"\bwhere\s+(?:is|are)\s+`?([A-Za-z_][\w.]*)`?(?:\(\))?\s+(?:defined|declared|implemented)\b", re.IGNORECASE),
+    re.compile(r"\b(?:find|locate)\s+(?:the\s+)?(?:definition\s+of\s+)?`?([A-Za-z_][\w.]*)`?(?:\(\))?\s*\??$", re.IGNORECASE),
+]
+
+
+class SymbolIndex:
+    """Exact table of the project's functions and their call relations.
+
+    Built from CodeAnalyzer scan results and the resolved
+    DependencyTracker graph. Names can be looked up by qualified name,
+    dotted suffix (`Class.method`) or bare name, and questions like "where
+    is X called" are answered from it directly instead of going through
+    retrieval and the LLM.
+    """
+
+    def __init__(self, dependency_graph: Dict[str, DependencyNode]):
+        self.dependency_graph = dependency_graph
+        self.by_name: Dict[str, List[str]] = defaultdict(list)
+        self.locations: Dict[str, Tuple[int, int]] = {}
+        for qualified_name in sorted(dependency_graph):
+            parts = qualified_name.split('.')
+            for start in range(len(parts)):
+                self.by_name['.'.join(parts[start:])].append(qualified_name)
+
+    @classmethod
+    def build(cls, project_path: str, file_paths: List[str],
+              cache: AnalysisCache = None) -> 'SymbolIndex':
+        analyzer = CodeAnalyzer(project_path, cache=cache)
+        tracker = DependencyTracker(project_path)
+        for analysis in analyzer.iter_scan(file_paths):
+            tracker.add_file_analysis(analysis)
+        tracker.resolve_calls()
+        return cls(tracker.dependency_graph)
+
+    def add_locations(self, chunks: Iterable[Dict]):
+        """Record line ranges from chunk metadata (see CodeChunk.metadata)."""
+        for metadata in chunks:
+            if metadata.get('qualified_name') in self.dependency_graph:
+                self.locations[metadata['qualified_name']] = (metadata['start_line'],
+                                                              metadata['end_line'])
+
+    def lookup(self, name: str) -> List[str]:
+        return list(self.by_name.get(name, []))
+
+    def mentioned(self, text: str) -> List[str]:
+        """Qualified names of every known function whose name appears in `text`."""
+        found = []
+        for token in set(re.findall(r"[A-Za-z_][\w.]*", text)):
+            found.extend(self.lookup(token.strip('.')))
+        return sorted(set(found))
+
+    def answer(self, question: str) -> Optional[str]:
+        """Answer a navigation question from the index, or None if it is not one."""
+        text = question.strip()
+        for patterns, describe in ((CALLERS_PATTERNS, self._describe_callers),
+                                   (CALLEES_PATTERNS, self._describe_callees),
+                                   (DEFINITION_PATTERNS, self._describe_definition)):
+            for pattern in patterns:
+                match = pattern.search(text)
+                if match:
+                    matches = self.lookup(match.group(1))
+                    if matches:
+                        return "\n".join(describe(name) for name in matches)
+        return None
+
+    def _where(self, qualified_name: str) -> str:
+        node = self.dependency_graph[qualified_name]
+        lines = self.locations.get(qualified_name)
+        return f"{node.file_path}:{lines[0]}-{lines[1]}" if lines else node.file_path
+
+    def _describe_callers(self, qualified_name: str) -> str:
+        callers = sorted(self.dependency_graph[qualified_name].callers)
+        if not callers:
+            return f"{qualified_name} is not called anywhere in the project."
+        listed = "\n".join(f"  - {caller} ({self._where(caller)})"
+                           if caller in self.dependency_graph else f"  - {caller}"
+                           for caller in callers)
+        return f"{qualified_name} is called by:\n{listed}"
+
+    def _describe_callees(self, qualified_name: str) -> str:
+        callees = sorted(self.dependency_graph[qualified_name].callees)
+        if not callees:
+            return f"{qualified_name} does not call any other function."
+        return f"{qualified_name} calls:\n" + "\n".join(f"  - {callee}" for callee in callees)
+
+    def _describe_definition(self, qualified_name: str) -> str:
+        return f"{qualified_name} is defined in {self._where(qualified_name)}"
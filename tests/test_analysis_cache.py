@@ -0,0 +1,40 @@
+import builtins
+import os
+import sys
+
+import pytest
+
+pytest.importorskip('tree_sitter')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analysis_cache import AnalysisCache  # noqa: E402
+from code_analyzer import CodeAnalyzer  # noqa: E402
+
+
+def test_cold_cache_reads_each_file_once_and_warm_cache_matches(tmp_path, monkeypatch):
+    project = tmp_path / 'project'
+    project.mkdir()
+    (project / 'inventory.py').write_text('def update_inventory(items):\n    return sorted(items)\n')
+    (project / 'orders.py').write_text('def process_order(items):\n    return update_inventory(items)\n')
+    file_paths = sorted(str(path) for path in project.glob('*.py'))
+
+    opened = []
+    real_open = builtins.open
+
+    def counting_open(file, *args, **kwargs):
+        if str(file).endswith('.py'):
+            opened.append(str(file))
+        return real_open(file, *args, **kwargs)
+
+    cache = AnalysisCache(str(tmp_path / 'cache.sqlite'))
+    monkeypatch.setattr(builtins, 'open', counting_open)
+    cold = [analysis.to_dict() for analysis in CodeAnalyzer(str(project), cache).iter_scan(file_paths)]
+    monkeypatch.undo()
+    assert sorted(opened) == file_paths
+    assert cache.misses == 2
+
+    warm = [analysis.to_dict() for analysis in CodeAnalyzer(str(project), cache).iter_scan(file_paths)]
+    assert warm == cold
+    assert cache.hits == 2
+    cache.close()
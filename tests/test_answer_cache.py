@@ -0,0 +1,67 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from answer_cache import AnswerCache  # noqa: E402
+
+HASHES = {'inventory.py': 'a1', 'orders.py': 'b1'}
+
+
+def make_cache(tmp_path, **options):
+    return AnswerCache(str(tmp_path / 'answers.json'), 'v1', **options)
+
+
+def test_exact_hit_ignores_case_spacing_and_punctuation(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put("What does update_inventory do?", None, "It decrements stock.",
+              {'inventory.py': 'a1'})
+    assert cache.get_exact("  what does   UPDATE_INVENTORY do ", HASHES) == "It decrements stock."
+    assert cache.get_exact("What does process_order do?", HASHES) is None
+    assert cache.stats()['exact_hits'] == 1
+
+
+def test_semantic_hit_needs_the_threshold(tmp_path):
+    cache = make_cache(tmp_path, threshold=0.9)
+    cache.put("how is stock updated", [1.0, 0.0], "By update_inventory.", {'inventory.py': 'a1'})
+    assert cache.get_similar([0.99, 0.05], HASHES) == "By update_inventory."
+    assert cache.get_similar([0.5, 0.5], HASHES) is None
+    assert cache.get_similar([1.0, 0.0, 0.0], HASHES) is None
+    assert cache.stats() == {'entries': 1, 'exact_hits': 0, 'semantic_hits': 1, 'misses': 2}
+
+
+def test_stale_best_match_falls_back_to_next_fresh_one(tmp_path):
+    cache = make_cache(tmp_path, threshold=0.9)
+    cache.put("fresh", [0.95, 0.31], "fresh answer", {'orders.py': 'b1'})
+    cache.put("stale", [1.0, 0.0], "stale answer", {'inventory.py': 'old'})
+    assert cache.get_similar([1.0, 0.0], HASHES) == "fresh answer"
+    assert list(cache.entries) == ['fresh']
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = make_cache(tmp_path, max_entries=2)
+    cache.put("first", None, "1", {})
+    cache.put("second", None, "2", {})
+    assert cache.get_exact("first", HASHES) == "1"
+    cache.put("third", None, "3", {})
+    assert list(cache.entries) == ['first', 'third']
+
+
+def test_entries_are_invalidated_when_a_source_file_changes(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put("inventory", [1.0, 0.0], "from inventory", {'inventory.py': 'a1'})
+    cache.put("orders", [0.0, 1.0], "from orders", {'orders.py': 'b1'})
+    cache.save()
+
+    changed = dict(HASHES, **{'inventory.py': 'a2'})
+    assert cache.get_exact("inventory", changed) is None
+    assert "inventory" not in cache.entries
+
+    reloaded = make_cache(tmp_path)
+    reloaded.load(changed)
+    assert list(reloaded.entries) == ['orders']
+    assert reloaded.get_similar([0.0, 1.0], changed) == "from orders"
+
+    other_version = AnswerCache(str(tmp_path / 'answers.json'), 'v2')
+    other_version.load(HASHES)
+    assert not other_version.entries
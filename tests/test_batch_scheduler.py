@@ -0,0 +1,108 @@
+import asyncio
+import os
+import random
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'data_analysis_project'))
+
+from analysis_engine import AnalysisEngine  # noqa: E402
+from batch_scheduler import BatchScheduler, iterate_batches, iterate_values  # noqa: E402
+from data_processor import DataProcessor  # noqa: E402
+
+
+class ShuffledScheduler(BatchScheduler):
+    """Finishes transforms in random order, as busy workers would."""
+
+    def __init__(self, *args, seed=0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.random = random.Random(seed)
+
+    async def _transform(self, batch):
+        await asyncio.sleep(self.random.random() / 100)
+        return await super()._transform(batch)
+
+
+def dataset(size=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.normal(15, 10, size).round(2).tolist()
+
+
+def per_point(values, batch_size, threshold=10.0):
+    processor = DataProcessor(threshold=threshold, vectorized=False)
+    results = [asyncio.run(processor.process_batch(values[i:i + batch_size]))
+               for i in range(0, len(values), batch_size)]
+    return processor, results
+
+
+def test_scheduled_batches_are_recorded_in_input_order():
+    values = dataset()
+    baseline, expected = per_point(values, 64)
+
+    async def schedule(executor=None):
+        processor = DataProcessor()
+        scheduler = ShuffledScheduler(processor, concurrency=8, queue_size=2, executor=executor)
+        return processor, await scheduler.run(iterate_batches(values, 64))
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        for executor in (None, pool):
+            processor, results = asyncio.run(schedule(executor))
+            assert [result["results"].tolist() for result in results] == \
+                [result["results"] for result in expected]
+            np.testing.assert_array_equal(processor.data_points.values, baseline.data_points.values)
+            np.testing.assert_array_equal(processor.data_points.processed,
+                                          baseline.data_points.processed)
+            assert processor.get_statistics(detailed=True) == baseline.get_statistics(detailed=True)
+
+
+def test_invalid_batches_are_reported_in_place():
+    batches = [[20.0], ["x"], [30.0, 1.0]]
+
+    async def schedule():
+        scheduler = ShuffledScheduler(DataProcessor(), concurrency=3, report_invalid=True,
+                                      validate=lambda batch: all(isinstance(v, float) for v in batch))
+        return await scheduler.run(iterate_values(batches))
+
+    results = [(result["status"], result.get("results", np.array([])).tolist())
+               for result in asyncio.run(schedule())]
+    assert results == [("success", [40.0]), ("error", []), ("success", [60.0])]
+
+
+def test_engine_with_process_workers_matches_per_point():
+    values = dataset(seed=1)
+    engine = AnalysisEngine(batch_size=100, concurrency=4, process_workers=2)
+    baseline, expected = per_point(values, 100, engine.processor.threshold)
+    result = asyncio.run(engine.run_analysis(values))
+    assert result["total_processed"] == sum(len(r["results"]) for r in expected)
+    assert result["statistics"] == baseline.get_statistics()
+
+
+def test_slow_first_batch_holds_back_the_source():
+    handed_out = 0
+
+    def source():
+        nonlocal handed_out
+        for i in range(100000):
+            handed_out += 1
+            yield [float(i)]
+
+    class SlowFirstScheduler(BatchScheduler):
+        async def _transform(self, batch):
+            if batch[0] == 0.0:
+                await asyncio.sleep(0.2)
+            return await super()._transform(batch)
+
+    async def first_result():
+        scheduler = SlowFirstScheduler(DataProcessor(), concurrency=4, queue_size=8)
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            scheduler.executor = pool
+            async for result in scheduler.stream(iterate_values(source())):
+                return result
+
+    assert asyncio.run(first_result())["status"] == "success"
+    # Workers run at most queue_size batches ahead of the slow one; the
+    # input queue, the waiting workers and the producer hold the rest
+    assert handed_out <= 8 + 8 + 4 + 1
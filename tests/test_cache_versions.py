@@ -0,0 +1,26 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analysis_cache import AnalysisCache  # noqa: E402
+
+
+def test_analyzer_bump_keeps_descriptions_and_layouts(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    cache = AnalysisCache(path, version="1")
+    cache.put('file_analysis', 'f', {'functions': []})
+    cache.put('ai_description:codebert', 'd', {'description': 'Sorts orders'})
+    cache.put('graph_layout:spring', 'g', {'positions': [[0.0, 1.0]]})
+    cache.close()
+
+    bumped = AnalysisCache(path, version="2")
+    assert bumped.get('file_analysis', 'f') is None
+    assert bumped.get('ai_description:codebert', 'd') == {'description': 'Sorts orders'}
+    assert bumped.get('graph_layout:spring', 'g') == {'positions': [[0.0, 1.0]]}
+    bumped.close()
+
+    reopened = AnalysisCache(path, version="2")
+    kinds = sorted(kind for kind, in reopened.connection.execute("SELECT kind FROM entries"))
+    assert kinds == ['ai_description:codebert', 'graph_layout:spring']
+    reopened.close()
@@ -0,0 +1,44 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from code_chunker import CodeChunker  # noqa: E402
+
+LARGE_CLASS = '''class Store:
+    """Keeps items."""
+    limit = 10
+
+    def add(self, item):
+        return item
+
+    if TYPE_CHECKING:
+        from typing import List
+
+    def remove(self, item):
+        return item
+
+    default = None
+'''
+
+
+def covered_lines(chunks):
+    return {line for chunk in chunks for line in range(chunk.start_line, chunk.end_line + 1)}
+
+
+def test_large_class_indexes_statements_between_and_after_methods():
+    chunks = CodeChunker(max_lines=5).chunk_source(LARGE_CLASS, 'store.py')
+    texts = "\n".join(chunk.text for chunk in chunks)
+    for statement in ['limit = 10', 'if TYPE_CHECKING:', 'from typing import List', 'default = None']:
+        assert statement in texts
+    code_lines = {number for number, line in enumerate(LARGE_CLASS.splitlines(), 1) if line.strip()}
+    assert code_lines <= covered_lines(chunks)
+    names = [(chunk.qualified_name, chunk.kind) for chunk in chunks]
+    assert names == [('store.Store', 'class'), ('store.Store.add', 'function'),
+                     ('store.Store', 'class'), ('store.Store.remove', 'function'),
+                     ('store.Store', 'class')]
+
+
+def test_small_class_is_one_chunk():
+    chunks = CodeChunker(max_lines=80).chunk_source(LARGE_CLASS, 'store.py')
+    assert [(chunk.start_line, chunk.end_line) for chunk in chunks] == [(1, 14)]
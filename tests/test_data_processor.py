@@ -0,0 +1,86 @@
+import asyncio
+import os
+import sys
+import time
+from array import array
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'data_analysis_project'))
+
+from data_processor import DataPoint, DataProcessor, PointStore  # noqa: E402
+
+BATCHES = [
+    [3, 11, 12.5, 40, 7.0, 10, 10.5],
+    array('i', [1, 25, 9, 18]),
+    array('d', [15.25, 2.0, 99.5]),
+    [],
+]
+
+
+def run_both(batches):
+    baseline = DataProcessor(vectorized=False)
+    vectorized = DataProcessor(vectorized=True)
+    pairs = [(asyncio.run(baseline.process_batch(batch)), asyncio.run(vectorized.process_batch(batch)))
+             for batch in batches]
+    return baseline, vectorized, pairs
+
+
+@pytest.mark.parametrize('batch', BATCHES)
+def test_vectorized_results_match_per_point_values_and_types(batch):
+    _, _, [(expected, actual)] = run_both([batch])
+    assert actual == expected
+    assert [type(value) for value in actual['results']] == \
+        [type(value) for value in expected['results']]
+
+
+def test_vectorized_records_points_and_statistics_like_per_point():
+    baseline, vectorized, _ = run_both(BATCHES)
+    np.testing.assert_array_equal(vectorized.data_points.values, baseline.data_points.values)
+    np.testing.assert_array_equal(vectorized.data_points.processed, baseline.data_points.processed)
+    assert vectorized.get_statistics(detailed=True) == baseline.get_statistics(detailed=True)
+
+
+def test_ndarray_batch_comes_back_as_python_floats():
+    processor = DataProcessor()
+    result = asyncio.run(processor.process_batch(np.array([5.0, 12.0, 30.5])))
+    assert result == {"status": "success", "results": [24.0, 61.0]}
+    assert all(type(value) is float for value in result['results'])
+    np.testing.assert_array_equal(processor.process_values(np.array([11.0, 1.0])), [22.0])
+
+
+def test_point_store_keeps_the_newest_points_in_order():
+    store = PointStore(max_points=5, chunk_size=4)
+    kept = []
+    for start in range(0, 23, 3):
+        values = np.arange(start, start + 3, dtype=np.float64)
+        store.append(values, values > 10)
+        kept = (kept + values.tolist())[-5:]
+        np.testing.assert_array_equal(store.values, kept)
+    assert len(store) == 5
+    assert [point.value for point in store] == kept
+    assert store[-1] == DataPoint(value=kept[-1], timestamp=store[-1].timestamp, processed=True)
+    assert type(store[0].value) is float and type(store[0].processed) is bool
+    with pytest.raises(IndexError):
+        store[5]
+
+
+def test_point_store_drops_points_older_than_max_age():
+    store = PointStore(max_age=5.0)
+    now = time.time_ns()
+    store.append(np.array([1.0, 2.0]), np.array([False, False]), now - 10 * 10**9)
+    store.append(np.array([3.0]), np.array([True]), now)
+    np.testing.assert_array_equal(store.values, [3.0])
+
+
+def test_retention_does_not_limit_statistics():
+    processor = DataProcessor(max_points=3)
+    for batch in ([20, 30], [1, 40], [50]):
+        asyncio.run(processor.process_batch(batch))
+    np.testing.assert_array_equal(processor.data_points.values, [1, 40, 50])
+    stats = processor.get_statistics()
+    assert stats["total_points"] == 5
+    assert stats["processed_points"] == 4
+    assert stats["average_value"] == 35.0
@@ -0,0 +1,48 @@
+import os
+import sys
+
+import pytest
+
+pytest.importorskip('langchain_core')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.documents import Document  # noqa: E402
+
+from hybrid_retriever import HybridRetriever  # noqa: E402
+
+
+def test_retriever_without_vectorstore_returns_nothing():
+    # An empty project leaves PersistentVectorIndex.vectorstore as None
+    retriever = HybridRetriever.from_vectorstore(None)
+    assert retriever.documents == []
+    assert retriever.invoke("What does process_order do?") == []
+
+
+class FakeVectorStore:
+    """Dense search that may only be called with a precomputed embedding."""
+
+    def __init__(self, documents):
+        self.docstore = self
+        self.documents = dict(enumerate(documents))
+        self.index_to_docstore_id = {i: i for i in self.documents}
+        self.vectors = []
+
+    def search(self, doc_id):
+        return self.documents[doc_id]
+
+    def similarity_search(self, query, k):
+        raise AssertionError("the query was embedded again")
+
+    def similarity_search_by_vector(self, embedding, k):
+        self.vectors.append(embedding)
+        return list(self.documents.values())[:k]
+
+
+def test_retrieve_reuses_the_question_embedding():
+    documents = [Document(page_content="def process_order(items): ...",
+                          metadata={'qualified_name': 'orders.process_order'})]
+    vectorstore = FakeVectorStore(documents)
+    retriever = HybridRetriever.from_vectorstore(vectorstore)
+    assert retriever.retrieve("What does process_order do?", [0.1, 0.2]) == documents
+    assert vectorstore.vectors == [[0.1, 0.2]]
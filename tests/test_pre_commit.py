@@ -0,0 +1,54 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip('tree_sitter')
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+INVENTORY = '''stock_levels = {'item1': 100}
+
+def update_inventory(items):
+    for item in items:
+        stock_levels[item] -= 1
+    return stock_levels
+'''
+
+ORDER_PROCESSING = '''from inventory import update_inventory
+
+def process_order(order_items):
+    update_inventory(order_items)
+'''
+
+
+def git(repo, *args):
+    subprocess.run(['git', *args], cwd=repo, check=True, capture_output=True)
+
+
+def run_hook(repo):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    return subprocess.run([sys.executable, os.path.join(ROOT, 'pre_commit')], cwd=repo,
+                          env=env, capture_output=True, text=True)
+
+
+def test_staged_change_is_checked_when_working_tree_is_reverted(tmp_path):
+    repo = tmp_path
+    git(repo, 'init', '-q')
+    git(repo, 'config', 'user.email', 'dev@example.com')
+    git(repo, 'config', 'user.name', 'dev')
+    (repo / 'inventory.py').write_text(INVENTORY)
+    (repo / 'order_processing.py').write_text(ORDER_PROCESSING)
+    git(repo, 'add', '.')
+    git(repo, 'commit', '-q', '-m', 'initial')
+
+    # Stage a signature change, then put the old code back in the working tree
+    (repo / 'inventory.py').write_text(INVENTORY.replace('(items)', '(items, warehouse)'))
+    git(repo, 'add', 'inventory.py')
+    (repo / 'inventory.py').write_text(INVENTORY)
+
+    result = run_hook(repo)
+    assert result.returncode == 1, result.stdout + result.stderr
+    assert 'inventory.update_inventory affects' in result.stdout
+    assert 'order_processing.process_order' in result.stdout
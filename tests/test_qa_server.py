@@ -0,0 +1,122 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from qa_server import QAServer  # noqa: E402
+
+
+class StubQASystem:
+    """Streams the question back between empty deltas, like an LLM often does.
+
+    The first answer is held until `release` is set, so the test can queue
+    everything else while the generation thread is busy.
+    """
+
+    def __init__(self):
+        self.asked = []
+        self.release = threading.Event()
+
+    def stream_answer(self, question):
+        self.asked.append(question)
+        self.release.wait(5)
+        yield from ['', question, '', ' done', '']
+
+
+async def read_chunked(reader):
+    head = await reader.readuntil(b'\r\n\r\n')
+    assert head.startswith(b'HTTP/1.1 200 OK')
+    assert b'Transfer-Encoding: chunked' in head
+    body = b''
+    while True:
+        size = int((await reader.readline()).strip(), 16)
+        if size == 0:
+            break
+        body += await reader.readexactly(size)
+        assert await reader.readexactly(2) == b'\r\n'
+    assert await reader.read() == b'\r\n'
+    return body.decode('utf-8')
+
+
+async def ask(socket_path, client, question):
+    reader, writer = await asyncio.open_unix_connection(socket_path)
+    body = json.dumps({'question': question}).encode('utf-8')
+    writer.write(b'POST /ask HTTP/1.1\r\nX-Client-Id: %s\r\nContent-Length: %d\r\n\r\n%s'
+                 % (client.encode('latin-1'), len(body), body))
+    await writer.drain()
+    # The writer is returned too: closing it would drop the connection
+    return reader, writer
+
+
+async def wait_for(condition):
+    for _ in range(500):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError('timed out')
+
+
+async def run_clients(socket_path):
+    qa_system = StubQASystem()
+    server = QAServer(qa_system)
+    serving = asyncio.create_task(server.serve(unix_path=socket_path))
+    try:
+        await wait_for(lambda: os.path.exists(socket_path))
+        readers = [await ask(socket_path, 'a', 'a1')]
+        await wait_for(lambda: qa_system.asked == ['a1'])
+        # Client a queues two more questions before client b asks its first
+        for client, question in [('a', 'a2'), ('a', 'a3'), ('b', 'b1')]:
+            readers.append(await ask(socket_path, client, question))
+            await wait_for(lambda: len(server.queue) == len(readers) - 1)
+        qa_system.release.set()
+        answers = [await read_chunked(reader) for reader, _ in readers]
+        for _, writer in readers:
+            writer.close()
+            await writer.wait_closed()
+        return qa_system.asked, answers, server.metrics.snapshot(len(server.queue))
+    finally:
+        serving.cancel()
+        await asyncio.gather(serving, return_exceptions=True)
+
+
+def test_clients_are_served_round_robin_and_empty_tokens_skipped(tmp_path):
+    asked, answers, metrics = asyncio.run(run_clients(str(tmp_path / 'qa.sock')))
+    # b1 gets its turn before a's third question, not after it
+    assert asked == ['a1', 'a2', 'b1', 'a3']
+    # Every response ran to its own terminator despite the empty deltas
+    assert answers == ['a1 done', 'a2 done', 'a3 done', 'b1 done']
+    assert metrics['completed'] == 4
+
+
+async def run_with_hang_up(socket_path):
+    qa_system = StubQASystem()
+    server = QAServer(qa_system)
+    serving = asyncio.create_task(server.serve(unix_path=socket_path))
+    try:
+        await wait_for(lambda: os.path.exists(socket_path))
+        first = await ask(socket_path, 'a', 'a1')
+        await wait_for(lambda: qa_system.asked == ['a1'])
+        _, writer = await ask(socket_path, 'b', 'b1')
+        await wait_for(lambda: len(server.queue) == 1)
+        # b hangs up while its question is still queued
+        writer.close()
+        await writer.wait_closed()
+        await asyncio.sleep(0.05)
+        qa_system.release.set()
+        answer = await read_chunked(first[0])
+        first[1].close()
+        await first[1].wait_closed()
+        await wait_for(lambda: server.metrics.cancelled == 1)
+        return qa_system.asked, answer
+    finally:
+        serving.cancel()
+        await asyncio.gather(serving, return_exceptions=True)
+
+
+def test_queued_client_that_hangs_up_is_not_answered(tmp_path):
+    asked, answer = asyncio.run(run_with_hang_up(str(tmp_path / 'qa.sock')))
+    assert answer == 'a1 done'
+    assert asked == ['a1']
@@ -0,0 +1,83 @@
+import math
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'data_analysis_project'))
+
+from running_stats import QuantileSketch, RunningStats, StatisticsTracker  # noqa: E402
+
+
+def batches(seed=0, count=40):
+    rng = np.random.default_rng(seed)
+    for size in rng.integers(0, 500, count):
+        values = rng.lognormal(3, 1.5, size) * rng.choice([-1, 1, 1, 1], size)
+        values[rng.random(size) < 0.05] = 0.0
+        yield values, values > -20
+
+
+def test_merged_batches_match_single_pass():
+    data = list(batches())
+    stats = RunningStats()
+    for values, processed in data:
+        stats.update(values, processed)
+
+    values = np.concatenate([values for values, _ in data])
+    processed = values[np.concatenate([processed for _, processed in data])]
+    assert stats.total == len(values)
+    assert stats.count == len(processed)
+    assert stats.value_sum == pytest.approx(processed.sum(), rel=1e-12)
+    assert stats.mean == pytest.approx(processed.mean(), rel=1e-12)
+    assert stats.variance == pytest.approx(processed.var(), rel=1e-9)
+    assert (stats.minimum, stats.maximum) == (processed.min(), processed.max())
+
+
+def test_merge_is_independent_of_how_batches_are_split():
+    data = list(batches(seed=1))
+    left, right, whole = RunningStats(), RunningStats(), RunningStats()
+    for i, (values, processed) in enumerate(data):
+        (left if i % 2 else right).update(values, processed)
+        whole.update(values, processed)
+    left.merge(right)
+    assert left.count == whole.count
+    assert left.mean == pytest.approx(whole.mean, rel=1e-12)
+    assert left.variance == pytest.approx(whole.variance, rel=1e-9)
+
+
+@pytest.mark.parametrize('relative_accuracy', [0.01, 0.05])
+def test_sketch_quantiles_within_relative_accuracy(relative_accuracy):
+    tracker = StatisticsTracker(sketch=True, relative_accuracy=relative_accuracy)
+    data = list(batches(seed=2))
+    for i, (values, processed) in enumerate(data):
+        tracker.update(values, processed, timestamp=i * 10**9)
+
+    processed = np.sort(np.concatenate([values[mask] for values, mask in data]))
+    quantiles = (0.0, 0.01, 0.25, 0.5, 0.9, 0.99, 1.0)
+    snapshot = tracker.snapshot(detailed=True, quantiles=quantiles)
+    for q in quantiles:
+        expected = processed[math.floor(q * (len(processed) - 1))]
+        estimate = snapshot["quantiles"][f"p{q * 100:g}"]
+        assert abs(estimate - expected) <= relative_accuracy * abs(expected) + 1e-12
+
+    # Per-batch sketches merged together equal one sketch fed everything
+    single = QuantileSketch(relative_accuracy)
+    single.update(processed)
+    assert [tracker.lifetime.sketch.quantile(q) for q in quantiles] == \
+        [single.quantile(q) for q in quantiles]
+
+
+def test_window_covers_only_recent_buckets():
+    tracker = StatisticsTracker(bucket_seconds=1.0)
+    data = list(batches(seed=3, count=10))
+    for i, (values, processed) in enumerate(data):
+        tracker.update(values, processed, timestamp=i * 10**9)
+
+    recent = np.concatenate([values[mask] for values, mask in data[7:]])
+    window = tracker.window(3.0, now=10 * 10**9).stats
+    assert window.total == sum(len(values) for values, _ in data[7:])
+    assert window.count == len(recent)
+    assert window.mean == pytest.approx(recent.mean(), rel=1e-12)
+    assert window.variance == pytest.approx(recent.var(), rel=1e-9)
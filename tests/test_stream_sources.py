@@ -0,0 +1,68 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'data_analysis_project'))
+
+from stream_sources import binary_chunks, csv_chunks, file_chunks  # noqa: E402
+
+
+def read_csv(path, **options):
+    return np.concatenate(list(csv_chunks(str(path), **options)))
+
+
+def test_csv_header_is_skipped_and_bad_row_dropped(tmp_path, caplog):
+    path = tmp_path / 'values.csv'
+    path.write_text('value,weight\n1.5,2\n3,oops\n4,5.25\n')
+    values = read_csv(path)
+    np.testing.assert_array_equal(values, [1.5, 2, 4, 5.25])
+    assert 'skipped 1 line(s) with non-numeric fields, first at line 3' in caplog.text
+
+
+def test_csv_bad_row_only_drops_itself_across_blocks(tmp_path):
+    path = tmp_path / 'values.csv'
+    rows = [str(i) for i in range(1000)]
+    rows[500] = 'n/a'
+    path.write_text('value\n' + '\n'.join(rows) + '\n')
+    values = read_csv(path, chunk_bytes=256)
+    np.testing.assert_array_equal(values, [i for i in range(1000) if i != 500])
+
+
+def test_csv_empty_fields_drop_their_lines(tmp_path, caplog):
+    path = tmp_path / 'values.csv'
+    path.write_text('1,,2\n3,4,\n5,6\n\n,7\n')
+    np.testing.assert_array_equal(read_csv(path), [5, 6])
+    assert 'skipped 3 line(s) with non-numeric fields, first at line 1' in caplog.text
+
+
+def test_csv_numeric_first_line_is_data(tmp_path):
+    path = tmp_path / 'values.csv'
+    path.write_text('1,2\n3,4')
+    np.testing.assert_array_equal(read_csv(path), [1, 2, 3, 4])
+    np.testing.assert_array_equal(read_csv(path, skip_header=True), [3, 4])
+
+
+def test_binary_partial_value_names_file_and_offset(tmp_path):
+    path = tmp_path / 'values.f64'
+    path.write_bytes(np.arange(3, dtype=np.float64).tobytes() + b'\x00\x01')
+    with pytest.raises(ValueError, match=r'values\.f64.*2 bytes at offset 24'):
+        list(binary_chunks(str(path)))
+
+
+def test_binary_whole_values(tmp_path):
+    path = tmp_path / 'values.f64'
+    np.arange(10, dtype=np.float64).tofile(path)
+    np.testing.assert_array_equal(np.concatenate(list(binary_chunks(str(path), chunk_size=4))),
+                                  np.arange(10))
+
+
+def test_csv_file_chunks_follow_chunk_size(tmp_path):
+    path = tmp_path / 'values.csv'
+    path.write_text(''.join(f'{i}\n' for i in range(1000)))
+    chunks = list(file_chunks(str(path), chunk_size=10))
+    assert max(len(chunk) for chunk in chunks) <= 10 * 16
+    assert len(chunks) > 1
+    np.testing.assert_array_equal(np.concatenate(chunks), np.arange(1000))
@@ -0,0 +1,122 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from analysis_cache import content_hash
+from ingestion import DEFAULT_BATCH_SIZE, DEFAULT_READ_WORKERS, IngestionPipeline, IngestionStats
+
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 1
+DEFAULT_INDEX_ROOT = ".code_qa_index"
+
+
+def _hash_file(file_path: str) -> str:
+    with open(file_path, 'rb') as f:
+        return content_hash(f.read())
+
+
+def default_index_dir(project_path: str) -> str:
+    absolute = os.path.abspath(project_path)
+    digest = hashlib.sha1(absolute.encode('utf-8')).hexdigest()[:8]
+    return os.path.join(DEFAULT_INDEX_ROOT, f"{os.path.basename(absolute)}-{digest}")
+
+
+class PersistentVectorIndex:
+    """FAISS index saved to disk with a manifest of the files behind it.
+
+    The manifest maps each file to its content hash and the IDs of its
+    vectors. sync() only re-embeds files that were added or changed and
+    deletes the vectors of changed or removed files, so an unchanged
+    codebase is loaded from disk without embedding anything. New vectors
+    come from an IngestionPipeline and are added batch by batch.
+    """
+
+    def __init__(self, embeddings, index_dir: str,
+                 load_documents: Callable[[str], List], loader_version: str = "",
+                 batch_size: int = DEFAULT_BATCH_SIZE, read_workers: int = DEFAULT_READ_WORKERS,
+                 progress: Optional[Callable] = None):
+        self.embeddings = embeddings
+        self.index_dir = index_dir
+        self.load_documents = load_documents
+        self.pipeline = IngestionPipeline(embeddings, load_documents, batch_size,
+                                          read_workers, progress)
+        self.last_ingestion = IngestionStats()
+        self.vectorstore = None
+        self.files: Dict[str, Dict] = {}
+        model = getattr(embeddings, 'model_name', type(embeddings).__name__)
+        # Saved vectors are only reusable with the same model and document loader
+        self.model = f"{model}:{loader_version}" if loader_version else model
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.index_dir, MANIFEST_FILE)
+
+    @property
+    def version(self) -> str:
+        return f"{MANIFEST_VERSION}:{self.model}"
+
+    def file_hashes(self) -> Dict[str, str]:
+        return {path: entry['hash'] for path, entry in self.files.items()}
+
+    def load(self):
+        if not os.path.exists(self.manifest_path):
+            return
+        with open(self.manifest_path, 'r') as f:
+            manifest = json.load(f)
+        # Vectors from another embedding model are useless; start over
+        if manifest.get('version') != MANIFEST_VERSION or manifest.get('model') != self.model:
+            return
+        self.files = manifest['files']
+        if any(entry['ids'] for entry in self.files.values()):
+            from langchain_community.vectorstores import FAISS
+            self.vectorstore = FAISS.load_local(self.index_dir, self.embeddings,
+                                                allow_dangerous_deserialization=True)
+
+    def save(self):
+        os.makedirs(self.index_dir, exist_ok=True)
+        if self.vectorstore is not None:
+            self.vectorstore.save_local(self.index_dir)
+        with open(self.manifest_path, 'w') as f:
+            json.dump({'version': MANIFEST_VERSION, 'model': self.model, 'files': self.files}, f)
+
+    def sync(self, file_paths: List[str]) -> Dict[str, int]:
+        self.load()
+        with ThreadPoolExecutor(max_workers=self.pipeline.read_workers) as pool:
+            current = dict(zip(file_paths, pool.map(_hash_file, file_paths)))
+
+        removed = [path for path in self.files if path not in current]
+        changed = [path for path, digest in current.items()
+                   if path in self.files and self.files[path]['hash'] != digest]
+        added = [path for path in current if path not in self.files]
+
+        stale_ids = [doc_id for path in removed + changed for doc_id in self.files[path]['ids']]
+        if stale_ids and self.vectorstore is not None:
+            self.vectorstore.delete(stale_ids)
+        for path in removed:
+            del self.files[path]
+
+        def record(path, file_ids):
+            self.files[path] = {'hash': current[path], 'ids': file_ids}
+
+        self.last_ingestion = self.pipeline.run(changed + added, self.add_embeddings, record)
+
+        if removed or changed or added or not os.path.exists(self.manifest_path):
+            self.save()
+        return {
+            'added': len(added),
+            'changed': len(changed),
+            'removed': len(removed),
+            'unchanged': len(current) - len(added) - len(changed)
+        }
+
+    def add_embeddings(self, text_embeddings: List, metadatas: List[dict], ids: List[str]):
+        if not text_embeddings:
+            return
+        if self.vectorstore is None:
+            from langchain_community.vectorstores import FAISS
+            self.vectorstore = FAISS.from_embeddings(text_embeddings, self.embeddings,
+                                                     metadatas=metadatas, ids=ids)
+        else:
+            self.vectorstore.add_embeddings(text_embeddings, metadatas=metadatas, ids=ids)